@@ -1,107 +1,282 @@
-import pandas as pd
+import os
+import csv
+import numpy as np
+
+
+# parsers for parameters written as 'a/b/c'
+def parse_float_list(value):
+
+    return [float(a) for a in value.split('/')]
+
+
+def parse_int_list(value):
+
+    return [int(a) for a in value.split('/')]
+
+
+# type of each parameter in aircraft database
+PARAMETER_TYPES = {
+    # aircraft and engine settings
+    'aircraft_type': str, 'engine_type': str, 'engine_settings': str,
+    'core_engine_settings': str, 'dist_fan_settings': str,
+    # cockpit
+    'huc': float, 'hlc': float, 'wc': float,
+    # cabin(fuselage)
+    'hlf': float, 'huf': float, 'wf': float,
+    # after cabin
+    'hau': float, 'wa': float,
+    # length
+    'l1': float, 'l2': float, 'l3': float,
+    # cockpit control
+    'uk': float,
+    # main wing
+    'ctip': float, 'croot': float, 'b': float, 'theta': float, 'jmx': float, 'jmz': float, 'pm': float, 'tcm': float,
+    # horizontal wing
+    'chtip': float, 'chroot': float, 'bh': float, 'thetah': float, 'jhx': float, 'jhz': float, 'ph': float,
+    'tch': float,
+    # vertical wing
+    'cvtip': float, 'cvroot': float, 'bv': float, 'thetav': float, 'jvx': float, 'jvz': float, 'pv': float,
+    'tcv': float,
+    # core engine
+    'rein': float, 'reout': float, 'tein': float, 'le': float, 'tcx': float, 'tcy': float, 'tcz': float,
+    'thetae': float,
+    # distributed electric fan
+    'rfin': float, 'rfout': float, 'tfin': float, 'nfan': int, 'lfan': float, 'tfz': float, 'tfx': float,
+    'thetaf': float,
+    # propeller(drone)
+    'txs': parse_float_list, 'angles': parse_int_list, 'radius': float, 'pr': float, 'lp': float,
+    'zdiffp': float, 'k': float, 'arm_r': float,
+}
+
+
+# parameter record of one aircraft
+class AircraftParameters(object):
+
+    __slots__ = ('cname',) + tuple(PARAMETER_TYPES)
+
+    def __init__(self, **params):
+
+        for name, value in params.items():
+            setattr(self, name, value)
+
+    def set_params(self, cname, row):
+        """
+        set parameters from one database row
+
+        :param cname: aircraft name
+        :param row: dictionary of column name and string value(unknown or empty columns are skipped)
+        """
+        self.cname = cname
+
+        for name, value in row.items():
+            if name not in PARAMETER_TYPES or value is None or value == '':
+                continue
+
+            setattr(self, name, PARAMETER_TYPES[name](value))
+
+
+# read header and rows of database
+def read_database(fname):
+    """
+    read aircraft database(csv), pandas is used only if the file cannot be parsed by csv module
+
+    :param fname: file name
+    :return: header(list of column names), rows(list of list of string values)
+    """
+    try:
+        with open(fname, newline='') as f:
+            sample = f.read(4096)
+            f.seek(0)
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+            reader = csv.reader(f, dialect)
+            header = next(reader)
+            rows = [values for values in reader if values]
+
+        return header, rows
+
+    except (csv.Error, UnicodeDecodeError, StopIteration):
+        pass
+
+    # fallback
+    import pandas as pd
+
+    df = pd.read_csv(fname, sep=None, engine='python', dtype=str, keep_default_na=False)
+
+    return list(df.columns), df.values.tolist()
+
+
+# read one aircraft of database
+def read_parameters(fname, row=0, params=None):
+    """
+    read one aircraft row of database into parameter record
+
+    :param fname: file name
+    :param row: row index of aircraft
+    :param params: parameter record to be filled(new AircraftParameters if it is None)
+    :return: params(AircraftParameters)
+    """
+    header, rows = read_database(fname)
+
+    if params is None:
+        params = AircraftParameters()
+
+    # the first column(without name) is aircraft name
+    values = rows[row]
+    params.set_params(values[0], dict(zip(header[1:], values[1:])))
+
+    return params
+
+
+# convert string values of one column into numpy array
+def convert_column(name, values):
+
+    parser = PARAMETER_TYPES[name]
+
+    if parser is float or parser is int:
+        column = np.array([parser(v) if v not in (None, '') else np.nan for v in values], dtype=float)
+        # integer column stays integer only if no aircraft lacks it
+        if parser is int and not np.isnan(column).any():
+            column = column.astype(int)
+
+        return column
+
+    if parser is str:
+        return np.array([v if v is not None else '' for v in values], dtype=str)
+
+    # list parameters are kept as objects
+    column = np.empty(len(values), dtype=object)
+    column[:] = [parser(v) if v not in (None, '') else None for v in values]
+
+    return column
+
+
+# catalogue of many aircraft(one numpy array per parameter)
+class ParameterCatalogue(object):
+    """
+    columnar parameter arrays of aircraft population
+
+    every parameter is also accessible as attribute(e.g. catalogue.b is the array of wing spans),
+    so the catalogue can be passed where argument class is expected by batched generators
+    """
+
+    def __init__(self, cnames, columns):
+
+        self.cnames = list(cnames)
+        self.columns = columns
+        # aircraft name => row index
+        self.index = {}
+        for idx, cname in enumerate(self.cnames):
+            self.index.setdefault(cname, idx)
+
+    def __len__(self):
+
+        return len(self.cnames)
+
+    def __getattr__(self, name):
+
+        columns = self.__dict__.get('columns', {})
+        if name not in columns:
+            raise AttributeError(name)
+
+        return columns[name]
+
+    def __getitem__(self, key):
+        """
+        get parameter record of one aircraft
+
+        :param key: aircraft name or row index
+        :return: params(AircraftParameters)
+        """
+        idx = self.index[key] if isinstance(key, str) else key
+
+        params = AircraftParameters(cname=self.cnames[idx])
+        for name, column in self.columns.items():
+            value = column[idx]
+
+            if value is None or (isinstance(value, float) and np.isnan(value)) or value == '':
+                continue
+            if isinstance(value, np.generic):
+                value = value.item()
+            if PARAMETER_TYPES[name] is int:
+                value = int(value)
+
+            setattr(params, name, value)
+
+        return params
+
+    def select(self, idx):
+        """
+        get sub catalogue
+
+        :param idx: row indices or boolean mask
+        :return: catalogue(ParameterCatalogue)
+        """
+        idx = np.arange(len(self))[idx]
+
+        return ParameterCatalogue([self.cnames[i] for i in idx],
+                                  {name: column[idx] for name, column in self.columns.items()})
+
+
+# read many aircraft at once
+def load_catalogue(path):
+    """
+    read all aircraft rows of database file, or of all csv files in directory
+
+    :param path: file name or directory name
+    :return: catalogue(ParameterCatalogue)
+    """
+    if os.path.isdir(path):
+        fnames = sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith('.csv'))
+    else:
+        fnames = [path]
+
+    cnames = []
+    records = []
+    names = []
+    for fname in fnames:
+        header, rows = read_database(fname)
+
+        for name in header[1:]:
+            if name in PARAMETER_TYPES and name not in names:
+                names.append(name)
+
+        for values in rows:
+            cnames.append(values[0])
+            records.append(dict(zip(header[1:], values[1:])))
+
+    columns = {name: convert_column(name, [record.get(name) for record in records]) for name in names}
+
+    return ParameterCatalogue(cnames, columns)
 
 
 # Normal Type Argument class(To manage database parameters)
-class NormalArguments(object):
+class NormalArguments(AircraftParameters):
+
+    __slots__ = ()
 
     def __init__(self, args):
 
+        super(NormalArguments, self).__init__()
+
         cname = args.cname
         fname = './AircraftData/{}.csv'.format(cname)
 
-        df = pd.read_csv(fname, index_col=0)
-        self.aircraft_type = df['aircraft_type'].values[0]
-        self.engine_type = df['engine_type'].values[0]
-        self.engine_settings = df['engine_settings'].values[0]
-
-        self.huc = df['huc'].values[0]
-        self.hlc = df['hlc'].values[0]
-        self.wc = df['wc'].values[0]
-
-        self.hlf = df['hlf'].values[0]
-        self.huf = df['huf'].values[0]
-        self.wf = df['wf'].values[0]
-
-        self.hau = df['hau'].values[0]
-        self.wa = df['wa'].values[0]
-
-        self.l1 = df['l1'].values[0]
-        self.l2 = df['l2'].values[0]
-        self.l3 = df['l3'].values[0]
-
-        self.uk = df['uk'].values[0]
-
-        self.ctip = df['ctip'].values[0]
-        self.croot = df['croot'].values[0]
-        self.b = df['b'].values[0]
-        self.theta = df['theta'].values[0]
-        self.jmx = df['jmx'].values[0]
-        self.jmz = df['jmz'].values[0]
-        self.pm = df['pm'].values[0]
-        self.tcm = df['tcm'].values[0]
-
-        self.chtip = df['chtip'].values[0]
-        self.chroot = df['chroot'].values[0]
-        self.bh = df['bh'].values[0]
-        self.thetah = df['thetah'].values[0]
-        self.jhx = df['jhx'].values[0]
-        self.jhz = df['jhz'].values[0]
-        self.ph = df['ph'].values[0]
-        self.tch = df['tch'].values[0]
-
-        self.cvtip = df['cvtip'].values[0]
-        self.cvroot = df['cvroot'].values[0]
-        self.bv = df['bv'].values[0]
-        self.thetav = df['thetav'].values[0]
-        self.jvx = df['jvx'].values[0]
-        self.jvz = df['jvz'].values[0]
-        self.pv = df['pv'].values[0]
-        self.tcv = df['tcv'].values[0]
-
-        self.rein = df['rein'].values[0]
-        self.reout = df['reout'].values[0]
-        self.tein = df['tein'].values[0]
-        self.le = df['le'].values[0]
-        self.tcx = df['tcx'].values[0]
-        self.tcy = df['tcy'].values[0]
-        self.tcz = df['tcz'].values[0]
-        self.thetae = df['thetae'].values[0]
+        read_parameters(fname, params=self)
 
 
 # Drone Type Argument class
-class DroneArguments(object):
+class DroneArguments(AircraftParameters):
+
+    __slots__ = ()
 
     def __init__(self, args):
+
+        super(DroneArguments, self).__init__()
+
         cname = args.cname
         fname = './AircraftData/{}.csv'.format(cname)
 
-        df = pd.read_csv(fname)
+        read_parameters(fname, params=self)
+
         self.aircraft_type = args.aircraft_type
         self.engine_type = args.engine_type
-        self.huc = df['huc'].values[0]
-        self.hlc = df['hlc'].values[0]
-        self.wc = df['wc'].values[0]
-
-        self.hlf = df['hlf'].values[0]
-        self.huf = df['huf'].values[0]
-        self.wf = df['wf'].values[0]
-
-        self.hau = df['hau'].values[0]
-        self.wa = df['wa'].values[0]
-
-        self.l1 = df['l1'].values[0]
-        self.l2 = df['l2'].values[0]
-        self.l3 = df['l3'].values[0]
-
-        self.uk = df['uk'].values[0]
-        txs = [float(a) for a in df['txs'].values[0].split('/')]
-        self.txs = txs
-        angles = [int(a) for a in df['angles'].values[0].split('/')]
-        self.angles = angles
-
-        self.radius = df['radius'].values[0]
-        self.pr = df['pr'].values[0]
-        self.lp = df['lp'].values[0]
-        self.zdiffp = df['zdiffp'].values[0]
-        self.k = df['k'].values[0]
-        self.arm_r = df['arm_r'].values[0]
@@ -0,0 +1,59 @@
+import numpy as np
+from functools import reduce
+
+# axis aligned bounding boxes of components
+# bounding box is numpy ndarray of shape (..., 2, 3), [..., 0, :] is minimum and [..., 1, :] is maximum corner
+# (leading axes are population axes)
+
+
+def bounding_box(arr, grid_ndim=1):
+    """
+    compute bounding box of point cloud or structured grid
+
+    :param arr: numpy ndarray of shape (..., *grid, 3)
+    :param grid_ndim: the number of grid axes(1 for point cloud of shape (..., n, 3))
+    :return: bounding box(numpy ndarray, shape (..., 2, 3))
+    """
+    axes = tuple(range(arr.ndim - 1 - grid_ndim, arr.ndim - 1))
+
+    return np.stack([np.min(arr, axis=axes), np.max(arr, axis=axes)], axis=-2)
+
+
+def merge_bounding_boxes(bboxes):
+    """
+    bounding box which covers every bounding box
+
+    :param bboxes: list of bounding boxes(None is skipped), population axes must be broadcastable
+    :return: bounding box(numpy ndarray, shape (..., 2, 3)), None if there is no bounding box
+    """
+    bboxes = [bbox for bbox in bboxes if bbox is not None]
+
+    if len(bboxes) == 0:
+        return None
+
+    # components which do not depend on population parameters are broadcast
+    lower = reduce(np.minimum, [bbox[..., 0, :] for bbox in bboxes])
+    upper = reduce(np.maximum, [bbox[..., 1, :] for bbox in bboxes])
+
+    return np.stack([lower, upper], axis=-2)
+
+
+def pull_axis_bounds(bbox, margin=0.05):
+    """
+    axis bounds of view which shows the whole bounding box(population axes are merged)
+
+    :param bbox: bounding box(numpy ndarray, shape (..., 2, 3)), None if there is no geometry
+    :param margin: margin on each side, ratio to the largest extent
+    :return: axis bounds [[xmin, xmax], [ymin, ymax], [zmin, zmax]], None if bbox is None
+    """
+    # no bounds, so that axes fall back to their own limits
+    if bbox is None:
+        return None
+
+    bbox = np.asarray(bbox).reshape(-1, 2, 3)
+    lower = np.min(bbox[:, 0, :], axis=0)
+    upper = np.max(bbox[:, 1, :], axis=0)
+
+    pad = margin * np.max(upper - lower)
+
+    return [[float(low - pad), float(high + pad)] for low, high in zip(lower, upper)]
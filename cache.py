@@ -0,0 +1,245 @@
+import os
+import sys
+import json
+import inspect
+import hashlib
+import numbers
+import numpy as np
+from functools import lru_cache
+
+
+# argument class wrapper which records the parameter names read by compute function
+class ParameterRecorder(object):
+
+    def __init__(self, arg_class):
+
+        self._arg_class = arg_class
+        self._names = set()
+
+    def __getattr__(self, name):
+
+        value = getattr(self._arg_class, name)
+        self._names.add(name)
+
+        return value
+
+    @property
+    def names(self):
+
+        return self._names
+
+
+# convert parameter value into json serializable one(hash must not depend on numpy/python types)
+def normalize_value(value):
+
+    if isinstance(value, np.ndarray):
+        return [normalize_value(v) for v in value.tolist()]
+
+    if isinstance(value, np.dtype) or (isinstance(value, type) and issubclass(value, np.generic)):
+        return np.dtype(value).name
+
+    if isinstance(value, np.generic):
+        value = value.item()
+
+    if isinstance(value, (list, tuple)):
+        return [normalize_value(v) for v in value]
+
+    if isinstance(value, numbers.Real) and not isinstance(value, bool):
+        return float(value)
+
+    return value
+
+
+# hash of array contents
+def hash_array(arr):
+
+    arr = np.ascontiguousarray(arr)
+    digest = hashlib.sha256(arr.tobytes())
+    digest.update('{}{}'.format(arr.dtype.str, arr.shape).encode())
+
+    return digest.hexdigest()
+
+
+# hash of source files which define compute function and the helpers it imports
+# (changing generator code invalidates cache)
+@lru_cache(maxsize=None)
+def hash_source(module_name):
+
+    module = sys.modules[module_name]
+
+    fnames = {inspect.getsourcefile(module)}
+    for value in vars(module).values():
+        if inspect.isfunction(value):
+            fnames.add(inspect.getsourcefile(value))
+
+    digest = hashlib.sha256()
+    for fname in sorted(fnames):
+        with open(fname, 'rb') as f:
+            digest.update(f.read())
+
+    return digest.hexdigest()
+
+
+class GeometryCache(object):
+    """
+    persistent geometry cache keyed by the parameters each compute function actually reads
+
+    every result is stored as one .npz file whose name is the hash of
+    (compute function, source code, parameters read, other arguments, sampling resolution),
+    and the least recently used files are removed when the total size exceeds max_bytes
+    """
+
+    def __init__(self, cache_dir='./GeometryCache', max_bytes=1 << 30):
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # the parameter names read by each compute function
+        self.reads_fname = os.path.join(self.cache_dir, 'reads.json')
+        self.reads = self.load_reads()
+
+    def load_reads(self):
+
+        try:
+            with open(self.reads_fname) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_reads(self):
+
+        tmp_fname = '{}.{}.tmp'.format(self.reads_fname, os.getpid())
+        with open(tmp_fname, 'w') as f:
+            json.dump(self.reads, f, indent=1, sort_keys=True)
+        os.replace(tmp_fname, self.reads_fname)
+
+    def compute(self, compute_func, arg_class, *args, **kwargs):
+        """
+        return geometry of compute_func(arg_class, *args, **kwargs), computing it only on cache miss
+
+        :param compute_func: compute function of component.py
+        :param arg_class: argument class
+        :return: same as compute_func
+        """
+        func_name = self.pull_function_name(compute_func, args, kwargs)
+
+        if func_name in self.reads:
+            key = self.pull_key(compute_func, arg_class, self.reads[func_name], args, kwargs)
+            result = self.load(key)
+            if result is not None:
+                return result
+
+        recorder = ParameterRecorder(arg_class)
+        result = compute_func(recorder, *args, **kwargs)
+
+        # keep the union so that every branch of compute function is covered
+        names = sorted(set(self.reads.get(func_name, [])) | recorder.names)
+        if names != self.reads.get(func_name):
+            self.reads[func_name] = names
+            self.save_reads()
+
+        key = self.pull_key(compute_func, arg_class, names, args, kwargs)
+        self.store(key, result)
+
+        return result
+
+    @staticmethod
+    def pull_function_name(compute_func, args, kwargs):
+
+        # non array arguments(e.g. engine settings) can switch the parameters which are read
+        options = [normalize_value(a) for a in args if not isinstance(a, np.ndarray)]
+        options += ['{}={}'.format(k, normalize_value(v)) for k, v in sorted(kwargs.items())
+                    if not isinstance(v, np.ndarray)]
+
+        return '{}.{}({})'.format(compute_func.__module__, compute_func.__qualname__,
+                                  ', '.join(str(o) for o in options))
+
+    @staticmethod
+    def pull_key(compute_func, arg_class, names, args, kwargs):
+
+        parameters = {}
+        for name in names:
+            parameters[name] = normalize_value(getattr(arg_class, name, None))
+
+        key_source = {'function': '{}.{}'.format(compute_func.__module__, compute_func.__qualname__),
+                      'source': hash_source(compute_func.__module__),
+                      'parameters': parameters,
+                      'args': [hash_array(a) if isinstance(a, np.ndarray) else normalize_value(a) for a in args],
+                      'kwargs': {k: hash_array(v) if isinstance(v, np.ndarray) else normalize_value(v)
+                                 for k, v in kwargs.items()}}
+
+        return hashlib.sha256(json.dumps(key_source, sort_keys=True).encode()).hexdigest()
+
+    def pull_fname(self, key):
+
+        return os.path.join(self.cache_dir, '{}.npz'.format(key))
+
+    def load(self, key):
+
+        fname = self.pull_fname(key)
+
+        try:
+            with np.load(fname) as data:
+                arrs = [data['arr_{}'.format(idx)] for idx in range(len(data.files) - 1)]
+                is_tuple = bool(data['is_tuple'])
+        except (OSError, KeyError, ValueError):
+            return None
+
+        # mark as recently used
+        os.utime(fname)
+
+        if is_tuple:
+            return tuple(arrs)
+
+        return arrs[0]
+
+    def store(self, key, result):
+
+        is_tuple = isinstance(result, tuple)
+        arrs = result if is_tuple else (result,)
+
+        fname = self.pull_fname(key)
+        tmp_fname = '{}.{}.tmp.npz'.format(fname[:-4], os.getpid())
+        np.savez(tmp_fname, *arrs, is_tuple=is_tuple)
+        os.replace(tmp_fname, fname)
+
+        self.evict()
+
+    def evict(self):
+        """
+        remove least recently used files until the total size is less than max_bytes
+        """
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.npz') and not entry.name.endswith('.tmp.npz'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.npz'):
+                os.remove(entry.path)
+
+
+# compute geometry through cache if it is given
+def compute_geometry(compute_func, arg_class, *args, cache=None, **kwargs):
+
+    if cache is None:
+        return compute_func(arg_class, *args, **kwargs)
+
+    return cache.compute(compute_func, arg_class, *args, **kwargs)
@@ -1,14 +1,212 @@
 import numpy as np
-from helper import bezier, turnover_3d
+from helper import bezier_curve, extrude_section, turnover_3d, turnover_points
 # helper function for view
 
+# every compute function accepts argument class whose parameters are scalars(one aircraft)
+# or numpy arrays of shape (N,)(population of N aircraft, e.g. ParameterCatalogue),
+# then the geometry of all aircraft is computed at once and stacked as (N, points, 3)
+# with structured=True, the structured grid(..., *grid, 3) is returned instead of point cloud
+# (the point cloud is its flattened view, see GRID_LAYOUTS for the surface axes of every grid)
+
+
+
+# sampling resolution(keyword arguments of compute functions) of every level of detail
+# preview: a few thousand points per aircraft for interactive viewing
+# standard: default of compute functions
+# export: hundreds of thousands of points per aircraft
+RESOLUTION_PRESETS = {
+    'preview': {'compute_cockpit_arr': {'nx': 16, 'ny': 10},
+                'compute_cabin_arr': {'nx': 16, 'ny': 10},
+                'compute_after_cabin_arr': {'nx': 16, 'ny': 10},
+                'compute_lifting_surface': {'nspan': 10, 'nchord': 10},
+                'compute_engine': {'nx': 12, 'nz': 10},
+                'compute_distributed_fan': {'nx': 12, 'nz': 10},
+                'compute_propeller_with_normal_position': {'nz': 6, 'nx': 12, 'arm_nx': 8, 'arm_ny': 6}},
+    'standard': {'compute_cockpit_arr': {'nx': 50, 'ny': 30},
+                 'compute_cabin_arr': {'nx': 50, 'ny': 30},
+                 'compute_after_cabin_arr': {'nx': 50, 'ny': 30},
+                 'compute_lifting_surface': {'nspan': 30, 'nchord': 30},
+                 'compute_engine': {'nx': 30, 'nz': 30},
+                 'compute_distributed_fan': {'nx': 30, 'nz': 30},
+                 'compute_propeller_with_normal_position': {'nz': 30, 'nx': 30, 'arm_nx': 30, 'arm_ny': 30}},
+    'export': {'compute_cockpit_arr': {'nx': 200, 'ny': 120},
+               'compute_cabin_arr': {'nx': 400, 'ny': 120},
+               'compute_after_cabin_arr': {'nx': 200, 'ny': 120},
+               'compute_lifting_surface': {'nspan': 200, 'nchord': 200},
+               'compute_engine': {'nx': 120, 'nz': 120},
+               'compute_distributed_fan': {'nx': 120, 'nz': 120},
+               'compute_propeller_with_normal_position': {'nz': 60, 'nx': 120, 'arm_nx': 120, 'arm_ny': 60}},
+}
+
+# compute functions which share the resolution of one kind of component
+RESOLUTION_KINDS = {'compute_main_wing_arr': 'compute_lifting_surface',
+                    'compute_horizontal_wing': 'compute_lifting_surface',
+                    'compute_vertical_wing': 'compute_lifting_surface',
+                    'compute_engine_lower_main_wing': 'compute_engine',
+                    'compute_engine_upper_main_wing': 'compute_engine',
+                    'compute_engine_upper_cabin': 'compute_engine',
+                    'compute_distributed_fan_at_main_wing': 'compute_distributed_fan',
+                    'compute_distributed_fan_upper_cabin': 'compute_distributed_fan'}
+
+
+def pull_resolution(compute_func, lod='standard', resolution=None):
+    """
+    get sampling keyword arguments of compute function
+
+    :param compute_func: compute function(or its name)
+    :param lod: level of detail(preview, standard or export)
+    :param resolution: keyword arguments which override preset(e.g. {'nspan': 100})
+    :return: keyword arguments(dictionary)
+    """
+    if lod not in RESOLUTION_PRESETS:
+        raise ValueError('unknown level of detail: {}'.format(lod))
+
+    name = compute_func if isinstance(compute_func, str) else compute_func.__name__
+    kwargs = dict(RESOLUTION_PRESETS[lod].get(RESOLUTION_KINDS.get(name, name), {}))
+    kwargs.update(resolution or {})
+
+    return kwargs
+
+
+# floating point type of geometry at every level of detail
+# (float32 is precise enough for viewing and halves memory, export keeps float64)
+LOD_DTYPES = {'preview': 'float32', 'standard': 'float32', 'export': 'float64'}
+
+
+def pull_dtype(lod='standard', dtype=None):
+    """
+    get floating point type of geometry
+
+    :param lod: level of detail(preview, standard or export)
+    :param dtype: type which overrides preset(e.g. 'float64')
+    :return: dtype(numpy dtype)
+    """
+    if dtype is not None:
+        return np.dtype(dtype)
+
+    if lod not in LOD_DTYPES:
+        raise ValueError('unknown level of detail: {}'.format(lod))
+
+    return np.dtype(LOD_DTYPES[lod])
+
+
+# population parameter with new trailing axes for broadcasting against grid axes
+def expand_param(value, ndim=1):
+
+    return np.asarray(value, dtype=float).reshape(np.shape(value) + (1,) * ndim)
+
+
+# list parameter(e.g. txs) as numpy array(..., n), every aircraft must have the same length
+def pull_list_param(value, name):
+
+    value = np.asarray(value)
+
+    if value.dtype == object:
+        try:
+            value = np.array(value.tolist(), dtype=float)
+        except ValueError:
+            raise ValueError('{} must have the same length for every aircraft in a batch'.format(name))
+
+    return value
+
+
+# parameter which changes the structure of geometry(e.g. the number of fans) must be common in a batch
+def pull_common_value(value, name):
+
+    values = np.unique(np.asarray(value))
+
+    if values.size != 1:
+        raise ValueError('{} must be the same for every aircraft in a batch'.format(name))
+
+    return values[0].item()
+
+
+# flatten structured grid into point cloud, leading population axes are kept
+def flatten_grid(grid_arr, grid_ndim):
+    """
+    flatten structured grid into point cloud
+
+    :param grid_arr: numpy ndarray(shape (..., *grid, 3))
+    :param grid_ndim: the number of grid axes(xyz axis is not included)
+    :return: points(numpy ndarray, shape (..., points, 3))
+    """
+    return grid_arr.reshape(grid_arr.shape[:grid_arr.ndim - grid_ndim - 1] + (-1, 3))
+
+
+# structured grid of every compute function => (the number of grid axes, surface axes(u, v) among grid axes)
+# the other grid axes are sheets(upper/lower, symmetric pair, fan, propeller) which are not connected each other
+GRID_LAYOUTS = {'compute_cockpit_arr': (3, (0, 1)),  # (x, y, upper/lower)
+                'compute_cabin_arr': (3, (0, 1)),  # (x, y, upper/lower)
+                'compute_after_cabin_arr': (3, (0, 1)),  # (x, y, upper/lower)
+                'compute_lifting_surface': (3, (0, 1)),  # (span, chord, upper/lower(/symmetric))
+                'compute_main_wing_arr': (3, (0, 1)),
+                'compute_horizontal_wing': (3, (0, 1)),
+                'compute_vertical_wing': (3, (0, 1)),
+                'compute_engine': (3, (0, 1)),  # (x, z, upper/lower/symmetric)
+                'compute_engine_lower_main_wing': (3, (0, 1)),
+                'compute_engine_upper_main_wing': (3, (0, 1)),
+                'compute_engine_upper_cabin': (3, (0, 1)),
+                'compute_distributed_fan_at_main_wing': (4, (1, 2)),  # (fan, x, z, upper/lower/symmetric)
+                'compute_distributed_fan_upper_cabin': (3, (0, 1)),  # (x, z, upper/lower(/symmetric))
+                # propeller(right/left, propeller, z, x, upper/lower), arm(x, y, propeller, right/left)
+                'compute_propeller_with_normal_position': ((5, (2, 3)), (4, (0, 1)))}
+
+
+# control points of bezier curve
+def control_points(points):
+    """
+    stack control points whose coords may be population arrays
+
+    :param points: list of (x, y) of every control point(each coord is scalar or numpy ndarray of shape (...))
+    :return: q(numpy ndarray, shape (..., n + 1, 2))
+    """
+    coords = np.broadcast_arrays(*[np.asarray(c, dtype=float) for point in points for c in point])
+
+    return np.stack(coords, axis=-1).reshape(coords[0].shape + (len(points), 2))
+
+
+# fuselage part whose sections are eclipses outlined by bezier curves
+def compute_eclipse_loft(x, bezier_y, bezier_zu, bezier_zl, ny=30, dtype=np.float64):
+    """
+    compute fuselage part array whose every section is eclipse(upper and lower halves)
+
+    :param x: x coords of sections(numpy ndarray, shape (..., nx))
+    :param bezier_y: half width of every section(shape (..., nx))
+    :param bezier_zu: upper height of every section(shape (..., nx))
+    :param bezier_zl: lower height of every section(shape (..., nx))
+    :param ny: the number of points along y axis at each section
+    :param dtype: floating point type of returned array
+    :return: loft_arr(numpy ndarray, shape (..., nx, ny, upper/lower, xyz))
+    """
+    # set y range of every section(..., nx, ny)
+    y = np.linspace(-bezier_y, bezier_y, ny, axis=-1)
+
+    # eclipse(the section whose width is 0 collapses into a point)
+    by = bezier_y[..., np.newaxis]
+    safe_by = np.where(by == 0, 1.0, by)
+    eclipse = np.where(by == 0, 0.0, np.sqrt(np.maximum(1.0 - y ** 2 / safe_by ** 2, 0.0)))
+
+    # compute loft array(..., section, y, upper/lower, xyz)
+    shape = np.broadcast_shapes(x.shape + (1,), y.shape, bezier_zu.shape + (1,), bezier_zl.shape + (1,))
+    loft_arr = np.empty(shape + (2, 3), dtype=dtype)
+    loft_arr[..., 0] = x[..., np.newaxis, np.newaxis]
+    loft_arr[..., 1] = y[..., np.newaxis]
+    loft_arr[..., 0, 2] = bezier_zu[..., np.newaxis] * eclipse
+    loft_arr[..., 1, 2] = bezier_zl[..., np.newaxis] * eclipse
+
+    return loft_arr
+
 
 # compute cockpit array
-def compute_cockpit_arr(arg_class):
+def compute_cockpit_arr(arg_class, nx=50, ny=30, structured=False, dtype=np.float64):
     """
     compute cockpit numpy array(3D)
 
     :param arg_class: argument class
+    :param nx: the number of sections along x axis
+    :param ny: the number of points along y axis at each section
+    :param structured: if True, return structured grid(..., nx, ny, 2, 3)
+    :param dtype: floating point type of returned array
     :return: cockpit_arr(numpy ndarray)
     """
     # set required parameters
@@ -22,51 +220,40 @@ def compute_cockpit_arr(arg_class):
     wf = arg_class.wf  # width of cabin(fuselage)
 
     # array for bezier curve
-    qzu = np.array([[0, 0], [l1 * uk, huc], [l1, huf]])
-    qzl = np.array([[0, 0], [l1 * uk, -hlc], [l1, -hlf]])
-    qy = np.array([[0, 0], [l1 * uk, wc], [l1, wf]])
+    qzu = control_points([(0, 0), (l1 * uk, huc), (l1, huf)])
+    qzl = control_points([(0, 0), (l1 * uk, -hlc), (l1, -hlf)])
+    qy = control_points([(0, 0), (l1 * uk, wc), (l1, wf)])
 
     # compute bezier curve
-    bezier_zu = []  # z coords of upper line
-    bezier_zl = []  # z coord of lower line
-    bezier_y = []  # y coord
-    for t in np.linspace(0, 1, 50):
-        bezier_zu.append(bezier(qzu.shape[0] - 1, t, qzu)[1])
-        bezier_zl.append(bezier(qzl.shape[0] - 1, t, qzl)[1])
-        bezier_y.append(bezier(qy.shape[0] - 1, t, qy)[1])
-
-    # compute cockpit array
-    cockpit_arr = []
-    # set x range
-    x = np.linspace(0.0, l1, 50)
-
-    for xi, bzl, bzu, by in zip(x, bezier_zl, bezier_zu, bezier_y):
-        # set y range
-        y = np.linspace(-by, by, 30)
+    bezier_zu = bezier_curve(qzu, nx)[..., 1]  # z coords of upper line
+    bezier_zl = bezier_curve(qzl, nx)[..., 1]  # z coord of lower line
+    bezier_y = bezier_curve(qy, nx)[..., 1]  # y coord
 
-        for yi in y:
-            # eclipse
-            if by == 0:
-                zui, zli = 0, 0
-            else:
-                zui = bzu * np.sqrt(1.0 - yi ** 2 / by ** 2)
-                zli = bzl * np.sqrt(1.0 - yi ** 2 / by ** 2)
+    # set x range
+    x = np.linspace(0.0, l1, nx, axis=-1)
 
-            cockpit_arr.append([xi, yi, zui])
-            cockpit_arr.append([xi, yi, zli])
+    cockpit_arr = compute_eclipse_loft(x, bezier_y, bezier_zu, bezier_zl, ny=ny, dtype=dtype)
 
-    cockpit_arr = np.array(cockpit_arr)
+    if structured:
+        return cockpit_arr
 
-    return cockpit_arr
+    return flatten_grid(cockpit_arr, 3)
 
 
 # compute cabin arr
-def compute_cabin_arr(arg_class):
+def compute_cabin_arr(arg_class, nx=50, ny=30, extrusion=False, structured=False, dtype=np.float64):
     """
     compute cabin numpy array(3D)
 
+    the cross section of cabin is constant along x axis, so it is computed once and extruded
+
     :param arg_class: argument class
-    :return: cabin_arr(numpy ndarray)
+    :param nx: the number of sections along x axis
+    :param ny: the number of points along y axis at the section
+    :param extrusion: if True, return (section, x) instead of the full array
+    :param structured: if True, return structured grid(..., nx, ny, 2, 3)
+    :param dtype: floating point type of returned array
+    :return: cabin_arr(numpy ndarray) or (section(numpy ndarray, shape (..., 2 * ny, 2)), x(numpy ndarray))
     """
     # set required parameters
     l1 = arg_class.l1  # section 1 length(cockpit)
@@ -75,44 +262,48 @@ def compute_cabin_arr(arg_class):
     hlf = arg_class.hlf  # height of lower at cabin(fuselage)
     wf = arg_class.wf  # width of cabin(fuselage)
 
-    # compute cabin arr
     # set x range
-    x = np.linspace(l1, l1 + l2, 50)
-    cabin_arr = []
+    x = np.linspace(l1, l1 + l2, nx, axis=-1)
 
-    for xi in x:
-        # set parameters for eclipse curve
-        z_u = huf
-        z_l = hlf
+    # set parameters for eclipse curve
+    b_u = expand_param(huf)
+    a_u = expand_param(wf)
 
-        b_u = z_u
-        a_u = wf
+    a_l = a_u
+    b_l = expand_param(hlf)
 
-        a_l = a_u
-        b_l = z_l
+    # set y range
+    y = np.linspace(-a_u[..., 0], a_u[..., 0], ny, axis=-1)
 
-        # set y range
-        y = np.linspace(-a_u, a_u, 30)
+    # cross section(..., y, upper/lower, yz)
+    shape = np.broadcast_shapes(y.shape, b_u.shape, b_l.shape)
+    section = np.empty(shape + (2, 2))
+    section[..., 0] = y[..., np.newaxis]
+    section[..., 0, 1] = b_u * np.sqrt(1.0 - (y / a_u) ** 2)
+    section[..., 1, 1] = -1 * b_l * np.sqrt(1.0 - (y / a_l) ** 2)
+    section = section.reshape(shape[:-1] + (-1, 2))
 
-        for yi in y:
-            # eclipse curve
-            zui = b_u * np.sqrt(1.0 - (yi / a_u) ** 2)
-            zli = -1 * b_l * np.sqrt(1.0 - (yi / a_l) ** 2)
+    if extrusion:
+        return section, x
 
-            cabin_arr.append([xi, yi, zui])
-            cabin_arr.append([xi, yi, zli])
+    if structured:
+        cabin_arr = extrude_section(section, x, flatten=False, dtype=dtype)
 
-    cabin_arr = np.array(cabin_arr)
+        return cabin_arr.reshape(cabin_arr.shape[:-2] + (-1, 2, 3))
 
-    return cabin_arr
+    return extrude_section(section, x, dtype=dtype)
 
 
 # compute after cabin arr
-def compute_after_cabin_arr(arg_class):
+def compute_after_cabin_arr(arg_class, nx=50, ny=30, structured=False, dtype=np.float64):
     """
     compute after cabin numpy array
 
     :param arg_class: argument class
+    :param nx: the number of sections along x axis
+    :param ny: the number of points along y axis at each section
+    :param structured: if True, return structured grid(..., nx, ny, 2, 3)
+    :param dtype: floating point type of returned array
     :return: after_cabin_arr(numpy ndarray)
     """
     # set required parameters
@@ -126,52 +317,103 @@ def compute_after_cabin_arr(arg_class):
     wa = arg_class.wa  # width of after cabin
     wf = arg_class.wf  # width of cabin(fuselage)
 
-    # create bezier curve
-    bezier_zu = []  # z coord for upper line
-    bezier_zl = []  # z coord for lower line
-    bezier_y = []  # y coord for y line
-
     # set array for bezier curve
-    qzu = np.array([[l1 + l2, huf], [l1 + l2 + 0.5 * l3, hau], [l1 + l2 + l3, hau]])
-    qzl = np.array([[l1 + l2, -hlf], [l1 + l2 + l3, -hlc], [l1 + l2 + l3, 0]])
-    qy = np.array([[l1 + l2, wf], [l1 + l2 + l3, wa], [l1 + l2 + l3, 0]])
+    qzu = control_points([(l1 + l2, huf), (l1 + l2 + 0.5 * l3, hau), (l1 + l2 + l3, hau)])
+    qzl = control_points([(l1 + l2, -hlf), (l1 + l2 + l3, -hlc), (l1 + l2 + l3, 0)])
+    qy = control_points([(l1 + l2, wf), (l1 + l2 + l3, wa), (l1 + l2 + l3, 0)])
 
     # compute bezier curve
-    for t in np.linspace(0, 1, 50):
-        bezier_zu.append(bezier(qzu.shape[0] - 1, t, qzu)[1])
-        bezier_zl.append(bezier(qzl.shape[0] - 1, t, qzl)[1])
-        bezier_y.append(bezier(qy.shape[0] - 1, t, qy)[1])
+    bezier_zu = bezier_curve(qzu, nx)[..., 1]  # z coord for upper line
+    bezier_zl = bezier_curve(qzl, nx)[..., 1]  # z coord for lower line
+    bezier_y = bezier_curve(qy, nx)[..., 1]  # y coord for y line
+
+    # set x range
+    x = np.linspace(l1 + l2, l1 + l2 + l3, nx, axis=-1)
 
-    # compute after cabin array
-    after_cabin_arr = []
-    x = np.linspace(l1 + l2, l1 + l2 + l3, 50)
+    # the tail end(width 0) collapses into the points on x axis
+    after_cabin_arr = compute_eclipse_loft(x, bezier_y, bezier_zu, bezier_zl, ny=ny, dtype=dtype)
 
-    for xi, bzl, bzu, by in zip(x, bezier_zl, bezier_zu, bezier_y):
-        # set y range
-        y = np.linspace(-by, by, 30)
+    if structured:
+        return after_cabin_arr
 
-        for yi in y:
-            zui = bzu * np.sqrt(1.0 - yi ** 2 / by ** 2)
-            zli = bzl * np.sqrt(1.0 - yi ** 2 / by ** 2)
+    return flatten_grid(after_cabin_arr, 3)
 
-            # exception
-            if np.isnan(zui):
-                zui, zli = 0, 0
 
-            after_cabin_arr.append([xi, yi, zui])
-            after_cabin_arr.append([xi, yi, zli])
+# compute lifting surface(wing) array
+def compute_lifting_surface(croot, ctip, root, tip, theta, xroot, tc, p, span_axis=1, mirror=True,
+                            nspan=30, nchord=30, structured=False, dtype=np.float64):
+    """
+    compute swept and tapered lifting surface numpy array with parabola airfoil
+
+    every parameter may be numpy array of shape (N,) to compute N surfaces at once
+
+    :param croot: root chord
+    :param ctip: tip chord
+    :param root: span coord of root(mounting point)
+    :param tip: span coord of tip
+    :param theta: retreat angle [deg]
+    :param xroot: x coord of leading edge at root
+    :param tc: the ratio of thickness and chord
+    :param p: constant for airfoil
+    :param span_axis: axis of span direction(1: y, 2: z), thickness is set on the other one
+    :param mirror: if True, add symmetric surface(y -> -y)
+    :param nspan: the number of sections along span
+    :param nchord: the number of points along chord at each section
+    :param structured: if True, return structured grid(..., nspan, nchord, 4 or 2, 3)
+    :param dtype: floating point type of returned array
+    :return: surface_arr(numpy ndarray)
+    """
+    # set span range(..., nspan)
+    s = np.linspace(root, tip, nspan, axis=-1)
+
+    # broadcast parameters against span axis
+    croot, ctip, root, tip, theta, xroot, tc, p = [expand_param(v) for v in (croot, ctip, root, tip, theta,
+                                                                              xroot, tc, p)]
 
-    after_cabin_arr = np.array(after_cabin_arr)
+    # x coord of upper line
+    xu = np.tan(theta * np.pi / 180.0) * (s - root) + xroot
+    # chord length(linear taper from root to tip)
+    cx = croot + (ctip - croot) * (s - root) / (tip - root)
+    # x coord of lower line
+    xl = xu + cx
 
-    return after_cabin_arr
+    # set x range of every section(..., nspan, nchord)
+    x = np.linspace(xu, xl, nchord, axis=-1)
+
+    # parabola
+    thickness = (-tc[..., np.newaxis] / (p[..., np.newaxis] * (1 - p[..., np.newaxis]) * cx[..., np.newaxis])
+                 * (x - xu[..., np.newaxis]) * (x - xl[..., np.newaxis]))
+
+    # compute surface array(..., span, chord, upper/lower(/symmetric upper/lower), xyz)
+    thickness_axis = 3 - span_axis
+    shape = np.broadcast_shapes(x.shape, thickness.shape)
+    surface_arr = np.empty(shape + (4 if mirror else 2, 3), dtype=dtype)
+    surface_arr[..., 0] = x[..., np.newaxis]
+    surface_arr[..., span_axis] = s[..., np.newaxis, np.newaxis]
+    surface_arr[..., 0, thickness_axis] = thickness
+    surface_arr[..., 1, thickness_axis] = -1 * thickness
+
+    # symmetric
+    if mirror:
+        surface_arr[..., 2:, :] = surface_arr[..., :2, :]
+        surface_arr[..., 2:, 1] *= -1
+
+    if structured:
+        return surface_arr
+
+    return flatten_grid(surface_arr, 3)
 
 
 # compute main wing array
-def compute_main_wing_arr(arg_class):
+def compute_main_wing_arr(arg_class, nspan=30, nchord=30, structured=False, dtype=np.float64):
     """
     compute main wing numpy array
 
     :param arg_class: argument class
+    :param nspan: the number of sections along span
+    :param nchord: the number of points along chord at each section
+    :param structured: if True, return structured grid(..., nspan, nchord, 4 or 2, 3)
+    :param dtype: floating point type of returned array
     :return: main_wing_arr
     """
     # set required parameters
@@ -180,7 +422,6 @@ def compute_main_wing_arr(arg_class):
     b = arg_class.b  # wing span
     theta = arg_class.theta  # retreat angle
     jmx = arg_class.jmx  # constant for x coord of mounting point
-    jmz = arg_class.jmz  # constant for z coord of mounting point
     wf = arg_class.wf  # width of cabin(fuselage)
     pm = arg_class.pm  # constant for airfoil
     tcm = arg_class.tcm  # the ratio of thickness and chord
@@ -191,52 +432,21 @@ def compute_main_wing_arr(arg_class):
     # total fuselage length
     l = l1 + l2 + l3
 
-    # start point of mounting point
-    st = [l * jmx, wf, l * jmz]
-
-    # set y range
-    y = np.linspace(wf, 0.5 * b, 30)
-
-    # helper constant for chord
-    BX = croot * (0.5 * b - wf) / (croot - ctip)
-
-    # compute main wing array
-    main_wing_arr = []
-
-    for yi in y:
-        # x coord of upper line of main wing
-        xu = np.tan(theta * np.pi / 180) * (yi - wf) + st[0]
-        # chord of x axis
-        cx = (1.0 - (yi - wf) / BX) * croot
-        # x coord of lower line of main wing
-        xl = xu + cx
-
-        # set x range
-        x = np.linspace(xu, xl, 30)
-
-        for xi in x:
-            # z coord of upper line of main wing
-            zui = -tcm / (pm * (1 - pm) * cx) * (xi - xu) * (xi - xl)
-            # z coord of lower line of main wing
-            zli = -1 * zui
-
-            main_wing_arr.append([xi, yi, zui])
-            main_wing_arr.append([xi, yi, zli])
-            # symmetric
-            main_wing_arr.append([xi, -yi, zui])
-            main_wing_arr.append([xi, -yi, zli])
-
-    main_wing_arr = np.array(main_wing_arr)
-
-    return main_wing_arr
+    # the root of main wing is mounted at the side of cabin
+    return compute_lifting_surface(croot, ctip, wf, 0.5 * b, theta, l * jmx, tcm, pm, span_axis=1, mirror=True,
+                                   nspan=nspan, nchord=nchord, structured=structured, dtype=dtype)
 
 
 # compute horizontal wing
-def compute_horizontal_wing(arg_class):
+def compute_horizontal_wing(arg_class, nspan=30, nchord=30, structured=False, dtype=np.float64):
     """
     compute horizontal wing numpy array
 
     :param arg_class: argument class
+    :param nspan: the number of sections along span
+    :param nchord: the number of points along chord at each section
+    :param structured: if True, return structured grid(..., nspan, nchord, 4 or 2, 3)
+    :param dtype: floating point type of returned array
     :return: hori_wing_arr(numpy ndarray)
     """
     # set required parameters
@@ -248,7 +458,6 @@ def compute_horizontal_wing(arg_class):
     bh = arg_class.bh  # horizontal wing span
     thetah = arg_class.thetah  # retreat angle of horizontal wing
     jhx = arg_class.jhx  # constant for x chord of mounting point
-    jhz = arg_class.jhz  # constant for z chord of mounting point
     ph = arg_class.ph  # constant for airfoil
     tch = arg_class.tch  # the ratio of thickness and chord
     wf = arg_class.wf  # width of cabin(fuselage)
@@ -256,51 +465,20 @@ def compute_horizontal_wing(arg_class):
     # total fuselage length
     l = l1 + l2 + l3
 
-    # helper constant for calculating horizontal wing's chord
-    BXh = chroot * (0.5 * bh - wf) / (chroot - chtip)
-
-    # start point of horizontal wing
-    sth = [l * jhx, wf, l * jhz]
-    # set y range
-    y = np.linspace(wf, 0.5 * bh, 30)
-    # Initialize horizontal wing array
-    hori_wing_arr = []
-
-    for yi in y:
-        # upper line of horizontal wing
-        xu = np.tan(thetah * np.pi / 180.0) * (yi - wf) + sth[0]
-        # calculate chord length
-        cx = (1.0 - (yi - wf) / BXh) * chroot
-        # lower line of horizontal wing
-        xl = xu + cx
-
-        # set x range
-        x = np.linspace(xu, xl, 30)
-
-        for xi in x:
-            # parabola
-            zui = -tch / (ph * (1 - ph) * cx) * (xi - xu) * (xi - xl)
-            zli = -1 * zui
-
-            # add (x, y, z) to the array
-            hori_wing_arr.append([xi, yi, zui])
-            hori_wing_arr.append([xi, yi, zli])
-
-            # symmetric
-            hori_wing_arr.append([xi, -yi, zui])
-            hori_wing_arr.append([xi, -yi, zli])
-
-    hori_wing_arr = np.array(hori_wing_arr)
-
-    return hori_wing_arr
+    return compute_lifting_surface(chroot, chtip, wf, 0.5 * bh, thetah, l * jhx, tch, ph, span_axis=1, mirror=True,
+                                   nspan=nspan, nchord=nchord, structured=structured, dtype=dtype)
 
 
 # compute vertical wing
-def compute_vertical_wing(arg_class):
+def compute_vertical_wing(arg_class, nspan=30, nchord=30, structured=False, dtype=np.float64):
     """
     compute vertical wing numpy array
 
     :param arg_class: argument class
+    :param nspan: the number of sections along span
+    :param nchord: the number of points along chord at each section
+    :param structured: if True, return structured grid(..., nspan, nchord, 4 or 2, 3)
+    :param dtype: floating point type of returned array
     :return: vert_wing_arr(numpy ndarray)
     """
     # set required parameters
@@ -312,136 +490,117 @@ def compute_vertical_wing(arg_class):
     bv = arg_class.bv  # vertical wing span
     thetav = arg_class.thetav  # retreat angle of vertical wing
     jvx = arg_class.jvx  # constant for x chord of mounting point
-    jvz = arg_class.jvz  # constant for z chord of mounting point
     pv = arg_class.ph  # constant for airfoil
     tcv = arg_class.tch  # the ratio of thickness and chord
     hau = arg_class.hau  # upper height of after cabin
-    wf = arg_class.wf  # width of cabin(fuselage)
 
     # total fuselage length
     l = l1 + l2 + l3
 
-    # helper constant for calculating vertical wing's chord
-    BXv = cvroot * (0.5 * bv - hau) / (cvroot - cvtip)
-
-    # start point of vertical wing
-    sth = [l * jvx, wf, l * jvz]
-    # set z range
-    z = np.linspace(hau, 0.5 * bv, 30)
-    # Initialize vertical wing array
-    vert_wing_arr = []
-
-    for zi in z:
-        # upper line of horizontal wing
-        xu = np.tan(thetav * np.pi / 180.0) * (zi - hau) + sth[0]
-        # calculate chord length
-        cx = (1.0 - (zi - hau) / BXv) * cvroot
-        # lower line of horizontal wing
-        xl = xu + cx
+    # the root of vertical wing is mounted on the upper line of after cabin, span is along z axis
+    return compute_lifting_surface(cvroot, cvtip, hau, 0.5 * bv, thetav, l * jvx, tcv, pv, span_axis=2, mirror=False,
+                                   nspan=nspan, nchord=nchord, structured=structured, dtype=dtype)
 
-        # set x range
-        x = np.linspace(xu, xl, 30)
 
-        for xi in x:
-            # parabola
-            yui = -tcv / (pv * (1 - pv) * cx) * (xi - xu) * (xi - xl)
-            yli = -1 * yui
+# extrema of components in closed form
+# (engines and propellers are placed from these, so they do not need the arrays of main wing and cabin)
+def compute_main_wing_max_z(arg_class):
+    """
+    compute maximum z coord of main wing
 
-            # add (x, y, z) to the array
-            vert_wing_arr.append([xi, yui, zi])
-            vert_wing_arr.append([xi, yli, zi])
+    the parabola airfoil is the thickest at the middle of chord(tc * chord / (4 * p * (1 - p))),
+    and the chord is the longest at root or tip
 
-    vert_wing_arr = np.array(vert_wing_arr)
+    :param arg_class: argument class
+    :return: maximum z coord(float or numpy ndarray of population)
+    """
+    # set required parameters
+    ctip = arg_class.ctip  # tip chord of main wing
+    croot = arg_class.croot  # hub chord of main wing
+    pm = arg_class.pm  # constant for airfoil
+    tcm = arg_class.tcm  # the ratio of thickness and chord
 
-    return vert_wing_arr
+    return tcm * np.maximum(croot, ctip) / (4 * pm * (1 - pm))
 
 
-# compute engine
-# engine which is equipped at lower part of main wing
-def compute_engine_lower_main_wing(arg_class, main_wing_arr):
+def compute_cabin_max_yz(arg_class):
     """
-    compute core engine array, which is equipped at lower main wing
+    compute maximum y and z coords of cabin(half axes of the upper eclipse section)
 
     :param arg_class: argument class
-    :param main_wing_arr: array of main wing
-    :return: engine_arr(numpy ndarray)
+    :return: maximum y coord, maximum z coord
     """
-    # set required parameters
-    rein = arg_class.rein  # inlet radius of engine
-    reout = arg_class.reout  # nozzle radius of engine
-    tein = arg_class.tein  # joint margin
-    le = arg_class.le  # engine length
-    tcx = arg_class.tcx  # coefficient of x to root chord
-    tcy = arg_class.tcy  # coefficient of y to wing span
-    tcz = arg_class.tcz  # coefficient of z to cabin height
-    jmx = arg_class.jmx  # constant for x coord of mounting point
-    croot = arg_class.croot  # root chord of main wing
-    wf = arg_class.wf  # width of cabin(fuselage)
-    b = arg_class.b  # main wing span
-    l1 = arg_class.l1  # section 1 length(cockpit)
-    l2 = arg_class.l2  # section 2 length(cabin)
-    l3 = arg_class.l3  # section 3 length(after cabin)
-
-    # total cabin length
-    l = l1 + l2 + l3
-
-    # joint point chords
-    joint_point = [l * jmx + croot * tcx, wf + (0.5 * b - wf) * tcy, -1 * np.max(main_wing_arr[:, 2])]
+    return arg_class.wf, arg_class.huf
 
-    # the center coordinates of engine(z coord)
-    zcen = joint_point[2] - tein - rein
-
-    # consider the outer curve of engine as parabola curve(z = a * x ** 2 + b * x + c)
-    # set x range
-    x = np.linspace(joint_point[0] - tcz * le, joint_point[0] + (1.0 - tcz) * le, 30)
 
-    # compute constant of outer line
-    az = -1 * (rein - reout) / (1 - 2 * tcz) / le ** 2
-    bz = -2 * joint_point[0] * az
-    cz = joint_point[2] + bz ** 2 / (4 * az)
+# compute engine
+# engine mounting modes(the names written in database are also accepted)
+ENGINE_SETTINGS = {'lower_main_wing': 'lower_main_wing', 'lower_mainwing': 'lower_main_wing',
+                   'upper_main_wing': 'upper_main_wing', 'upper_mainwing': 'upper_main_wing',
+                   'upper_cabin': 'upper_cabin'}
 
-    # Initialize engine arr
-    engine_arr_low = []
 
-    for xi in x:
-        # outer engine curve
-        # upper line
-        zu = az * xi ** 2 + bz * xi + cz
-        # lower line
-        zl = 2 * zcen - zu
+# nacelle(engine body) which is described by outer line and circle cross section
+def compute_nacelle(x, zl, zu, zcen, ycen, mirror=True, nz=30, dtype=np.float64):
+    """
+    compute nacelle numpy array
+
+    every argument may carry leading axes to build a bank of nacelles at once
+    (e.g. x of shape (nfan, nx) and ycen of shape (nfan,))
+
+    :param x: x coords of sections(numpy ndarray, shape (..., nx))
+    :param zl: z coords of lower line at each section(shape (..., nx))
+    :param zu: z coords of upper line at each section(shape (..., nx))
+    :param zcen: z coord at the center of nacelle(scalar or shape (...))
+    :param ycen: y coord at the center of nacelle(scalar or shape (...))
+    :param mirror: if True, add symmetric nacelle(y -> -y)
+    :param nz: the number of points along z axis at each section
+    :param dtype: floating point type of returned array
+    :return: nacelle_arr(numpy ndarray, shape (..., nx, nz, upper/lower(/symmetric upper/lower), xyz))
+    """
+    x = np.asarray(x)
+    zu = np.asarray(zu)
+    zcen = np.asarray(zcen)[..., np.newaxis, np.newaxis]
+    ycen = np.asarray(ycen)[..., np.newaxis, np.newaxis]
 
-        # set z range
-        z = np.linspace(zl, zu, 30)
+    # set z range of every section(..., nx, nz)
+    z = np.linspace(zl, zu, nz, axis=-1)
 
-        for zi in z:
-            # eclipse cross section
-            target = np.sqrt((zu - zcen) ** 2 - (zi - zcen) ** 2)
-            # upper line
-            yui = joint_point[1] + target
-            # lower line
-            yli = joint_point[1] - target
+    # eclipse cross section
+    target = np.sqrt(np.maximum((zu[..., np.newaxis] - zcen) ** 2 - (z - zcen) ** 2, 0.0))
 
-            # add (x, y, z) to array
-            engine_arr_low.append([xi, yui, zi])
-            engine_arr_low.append([xi, yli, zi])
-            # symmetric
-            engine_arr_low.append([xi, -yui, zi])
-            engine_arr_low.append([xi, -yli, zi])
+    # compute nacelle array(..., section, z, upper/lower(/symmetric upper/lower), xyz)
+    shape = np.broadcast_shapes(x.shape + (1,), z.shape, target.shape, ycen.shape)
+    nacelle_arr = np.empty(shape + (4 if mirror else 2, 3), dtype=dtype)
+    nacelle_arr[..., 0] = x[..., np.newaxis, np.newaxis]
+    nacelle_arr[..., 0, 1] = ycen + target
+    nacelle_arr[..., 1, 1] = ycen - target
+    nacelle_arr[..., 2] = z[..., np.newaxis]
 
-    engine_arr_low = np.array(engine_arr_low)
+    # symmetric
+    if mirror:
+        nacelle_arr[..., 2:, :] = nacelle_arr[..., :2, :]
+        nacelle_arr[..., 2:, 1] *= -1
 
-    return engine_arr_low
+    return nacelle_arr
 
 
-# engine which is equipped with upper part of main wing
-def compute_engine_upper_main_wing(arg_class, main_wing_arr):
+# core engine with every mounting mode
+def compute_engine(arg_class, engine_settings, nx=30, nz=30, structured=False, dtype=np.float64):
     """
-    compute upper main wing engine array
+    compute core engine array
 
     :param arg_class: argument class
-    :param main_wing_arr: array of main wing
-    :return: engine_arr_up(numpy ndarray)
+    :param engine_settings: mounting mode(lower_main_wing, upper_main_wing or upper_cabin), common in a batch
+    :param nx: the number of sections along x axis
+    :param nz: the number of points along z axis at each section
+    :param structured: if True, return structured grid(..., nx, nz, 4, 3)
+    :param dtype: floating point type of returned array
+    :return: engine_arr(numpy ndarray)
     """
+    if engine_settings not in ENGINE_SETTINGS:
+        raise ValueError('unknown engine settings: {}'.format(engine_settings))
+    engine_settings = ENGINE_SETTINGS[engine_settings]
 
     # set required parameters
     rein = arg_class.rein  # inlet radius of engine
@@ -449,12 +608,7 @@ def compute_engine_upper_main_wing(arg_class, main_wing_arr):
     tein = arg_class.tein  # joint margin
     le = arg_class.le  # engine length
     tcx = arg_class.tcx  # coefficient of x to root chord
-    tcy = arg_class.tcy  # coefficient of y to wing span
     tcz = arg_class.tcz  # coefficient of z to cabin height
-    jmx = arg_class.jmx  # constant for x coord of mounting point
-    croot = arg_class.croot  # root chord of main wing
-    wf = arg_class.wf  # width of cabin(fuselage)
-    b = arg_class.b  # main wing span
     l1 = arg_class.l1  # section 1 length(cockpit)
     l2 = arg_class.l2  # section 2 length(cabin)
     l3 = arg_class.l3  # section 3 length(after cabin)
@@ -462,132 +616,130 @@ def compute_engine_upper_main_wing(arg_class, main_wing_arr):
     # total cabin length
     l = l1 + l2 + l3
 
-    # set engine joint point
-    joint_point = [l * jmx + croot * tcx, wf + (0.5 * b - wf) * tcy, np.max(main_wing_arr[:, 2])]
-    # z coord at the center of engine
-    zcen = joint_point[2] + tein + rein
+    if engine_settings == 'upper_cabin':
+        thetae = arg_class.thetae  # angle for engine equipment
 
-    # set x range
-    x = np.linspace(joint_point[0] - tcz * le, joint_point[0] + (1 - tcz) * le, 30)
-
-    # compute constant for describing engine outer line
-    az = (rein - reout) / (1 - 2 * tcz) / le ** 2
-    bz = -2 * joint_point[0] * az
-    cz = joint_point[2] + bz ** 2 / (4 * az)
+        # max cabin y coords, max cabin z coords
+        eca, ecb = compute_cabin_max_yz(arg_class)
 
-    # Initialize engine array
-    engine_arr_up = []
+        # convert radians
+        thetae = thetae * np.pi / 180.0
 
-    for xi in x:
-        # lower line
-        zl = az * xi ** 2 + bz * xi + cz
-        # upper line
-        zu = 2 * zcen - zl
-        # set z range
-        z = np.linspace(zl, zu, 30)
+        # calculate distance between cabin center and engine center at yz plane
+        # original point is considered as cabin center and assume polar coordnates
+        r = np.sqrt((eca * np.cos(thetae)) ** 2 + (ecb * np.cos(thetae)) ** 2)
 
-        for zi in z:
-            # eclipse curve(cross section)
-            target = np.sqrt((zu - zcen) ** 2 - (zi - zcen) ** 2)
-            yui = joint_point[1] + target
-            yli = joint_point[1] - target
+        # set engine joint point
+        joint_point = [l * tcx, r * np.cos(thetae), r * np.sin(thetae)]
+        # z coord of center of engine
+        zcen = (r + rein + tein) * np.sin(thetae)
 
-            # add engine array
-            engine_arr_up.append([xi, yui, zi])
-            engine_arr_up.append([xi, yli, zi])
+        # compute constant for outer engine line
+        az = (rein - reout) * np.cos(thetae) / (1 - 2 * tcz) / le ** 2
+        bz = (tcz * le - 2 * joint_point[0]) * az - tein * np.cos(thetae) / (tcz * le)
+        cz = joint_point[2] - (rein + tein) * np.cos(thetae) - az * joint_point[0] ** 2 - bz * joint_point[0]
 
-            # symmetric
-            engine_arr_up.append([xi, -yui, zi])
-            engine_arr_up.append([xi, -yli, zi])
+    else:
+        tcy = arg_class.tcy  # coefficient of y to wing span
+        jmx = arg_class.jmx  # constant for x coord of mounting point
+        croot = arg_class.croot  # root chord of main wing
+        wf = arg_class.wf  # width of cabin(fuselage)
+        b = arg_class.b  # main wing span
 
-    engine_arr_up = np.array(engine_arr_up)
+        # lower engine hangs below the wing, upper engine sits on it
+        sign = -1 if engine_settings == 'lower_main_wing' else 1
 
-    return engine_arr_up
+        # joint point chords
+        joint_point = [l * jmx + croot * tcx, wf + (0.5 * b - wf) * tcy, sign * compute_main_wing_max_z(arg_class)]
 
+        # the center coordinates of engine(z coord)
+        zcen = joint_point[2] + sign * (tein + rein)
 
-# engine which is equipped with upper part of cabin(fuselage)
-def compute_engine_upper_cabin(arg_class, cabin_arr):
-    """
-    compute engine upper cabin array
+        # consider the outer curve of engine as parabola curve(z = a * x ** 2 + b * x + c)
+        az = sign * (rein - reout) / (1 - 2 * tcz) / le ** 2
+        bz = -2 * joint_point[0] * az
+        cz = joint_point[2] + bz ** 2 / (4 * az)
 
-    :param arg_class: argument class
-    :param cabin_arr: cabin array
-    :return: engine_fus_arr_up(numpy ndarray)
-    """
-    # set required parameters
-    rein = arg_class.rein  # inlet radius of engine
-    reout = arg_class.reout  # nozzle radius of engine
-    tein = arg_class.tein  # joint margin
-    le = arg_class.le  # engine length
-    thetae = arg_class.thetae  # angle for engine equipment
-    tcx = arg_class.tcx  # coefficient of x to root chord
-    tcz = arg_class.tcz  # coefficient of z to cabin height
-    l1 = arg_class.l1  # section 1 length(cockpit)
-    l2 = arg_class.l2  # section 2 length(cabin)
-    l3 = arg_class.l3  # section 3 length(after cabin)
+    # set x range
+    x = np.linspace(joint_point[0] - tcz * le, joint_point[0] + (1.0 - tcz) * le, nx, axis=-1)
 
-    # total cabin length
-    l = l1 + l2 + l3
+    # outer engine line which is touching the joint point, the other line is symmetric about the center
+    z_joint = expand_param(az) * x ** 2 + expand_param(bz) * x + expand_param(cz)
+    z_other = 2 * expand_param(zcen) - z_joint
 
-    # max cabin y coords
-    eca = np.max(cabin_arr[:, 1])
-    # max cabin z coords
-    ecb = np.max(cabin_arr[:, 2])
+    if engine_settings == 'lower_main_wing':
+        zl, zu = z_other, z_joint
+    else:
+        zl, zu = z_joint, z_other
 
-    # convert radians
-    thetae = thetae * np.pi / 180.0
+    engine_arr = compute_nacelle(x, zl, zu, zcen, joint_point[1], mirror=True, nz=nz, dtype=dtype)
 
-    # calculate distance between cabin center and engine center at yz plane
-    # original point is considered as cabin center and assume polar coordnates
-    r = np.sqrt((eca * np.cos(thetae)) ** 2 + (ecb * np.cos(thetae)) ** 2)
+    if structured:
+        return engine_arr
 
-    # set engine joint point
-    joint_point = [l * tcx, r * np.cos(thetae), r * np.sin(thetae)]
-    # z coord of center of engine
-    zcen = (r + rein + tein) * np.sin(thetae)
+    return flatten_grid(engine_arr, 3)
 
-    # compute constant for outer engine line
-    az = (rein - reout) * np.cos(thetae) / (1 - 2 * tcz) / le ** 2
-    bz = (tcz * le - 2 * joint_point[0]) * az - tein * np.cos(thetae) / (tcz * le)
-    cz = joint_point[2] - (rein + tein) * np.cos(thetae) - az * joint_point[0] ** 2 - bz * joint_point[0]
 
-    # set x range
-    x = np.linspace(joint_point[0] - tcz * le, joint_point[0] + (1 - tcz) * le, 30)
+# engine which is equipped at lower part of main wing
+def compute_engine_lower_main_wing(arg_class, nx=30, nz=30, structured=False, dtype=np.float64):
+    """
+    compute core engine array, which is equipped at lower main wing
 
-    # Initialize engine arr
-    engine_fus_arr_up = []
+    :param arg_class: argument class
+    :param nx: the number of sections along x axis
+    :param nz: the number of points along z axis at each section
+    :param structured: if True, return structured grid(..., nx, nz, 4, 3)
+    :param dtype: floating point type of returned array
+    :return: engine_arr(numpy ndarray)
+    """
+    return compute_engine(arg_class, 'lower_main_wing', nx=nx, nz=nz, structured=structured, dtype=dtype)
 
-    for xi in x:
-        # engine lower line
-        zl = az * xi ** 2 + bz * xi + cz
-        # engine upper line
-        zu = 2 * zcen - zl
-        # set z range
-        z = np.linspace(zl, zu, 30)
 
-        for zi in z:
-            # eclipse line
-            target = np.sqrt((zu - zcen) ** 2 - (zi - zcen) ** 2)
-            yui = joint_point[1] + target
-            yli = joint_point[1] - target
+# engine which is equipped with upper part of main wing
+def compute_engine_upper_main_wing(arg_class, nx=30, nz=30, structured=False, dtype=np.float64):
+    """
+    compute upper main wing engine array
 
-            engine_fus_arr_up.append([xi, yui, zi])
-            engine_fus_arr_up.append([xi, yli, zi])
+    :param arg_class: argument class
+    :param nx: the number of sections along x axis
+    :param nz: the number of points along z axis at each section
+    :param structured: if True, return structured grid(..., nx, nz, 4, 3)
+    :param dtype: floating point type of returned array
+    :return: engine_arr_up(numpy ndarray)
+    """
+    return compute_engine(arg_class, 'upper_main_wing', nx=nx, nz=nz, structured=structured, dtype=dtype)
 
-            # symmetric
-            engine_fus_arr_up.append([xi, -yui, zi])
-            engine_fus_arr_up.append([xi, -yli, zi])
 
-    engine_fus_arr_up = np.array(engine_fus_arr_up)
+# engine which is equipped with upper part of cabin(fuselage)
+def compute_engine_upper_cabin(arg_class, nx=30, nz=30, structured=False, dtype=np.float64):
+    """
+    compute engine upper cabin array
 
-    return engine_fus_arr_up
+    :param arg_class: argument class
+    :param nx: the number of sections along x axis
+    :param nz: the number of points along z axis at each section
+    :param structured: if True, return structured grid(..., nx, nz, 4, 3)
+    :param dtype: floating point type of returned array
+    :return: engine_fus_arr_up(numpy ndarray)
+    """
+    return compute_engine(arg_class, 'upper_cabin', nx=nx, nz=nz, structured=structured, dtype=dtype)
 
 
 # compute distributed electric fan
 # distributed electric fan equipping with some parts of main wing(upper or lower)
-def compute_distributed_fan_at_main_wing(arg_class, main_wing_arr):
+def compute_distributed_fan_at_main_wing(arg_class, nx=30, nz=30, structured=False, dtype=np.float64):
+    """
+    compute distributed electric fan array, which is equipped at main wing
+
+    :param arg_class: argument class(the number of fans must be common in a batch)
+    :param nx: the number of sections along x axis of each fan
+    :param nz: the number of points along z axis at each section
+    :param structured: if True, return structured grid(..., nfan, nx, nz, 4, 3)
+    :param dtype: floating point type of returned array
+    :return: distributed_fan_arr(numpy ndarray)
+    """
     # distributed fan parameters
-    nfan = arg_class.nfan  # the number of distributed electric fan
+    nfan = int(pull_common_value(arg_class.nfan, 'nfan'))  # the number of distributed electric fan
     rfin = arg_class.rfin  # radius of distributed electric fan
     rfout = arg_class.rfout  # radius of distributed electric fan
     r_margin = 0.1  # margin for radius of electric fan
@@ -606,65 +758,57 @@ def compute_distributed_fan_at_main_wing(arg_class, main_wing_arr):
     l = arg_class.l1 + arg_class.l2 + arg_class.l3  # fuselage(cabin) length
 
     # sign which indicates where to joint
-    if arg_class.dist_fan_settings == 'lower_mainwing':
-        sign = -1
-    else:
-        sign = 1
+    sign = np.where(np.asarray(arg_class.dist_fan_settings) == 'lower_mainwing', -1, 1)
 
     # joint point's coords
-    joint_point_init = [l * jmx + croot * tcx, wf + (b / 2 - wf) * tcy, sign * np.max(main_wing_arr[:, 2])]
-    # distributed fan array
-    distributed_fan_arr = []
-
-    for n in range(nfan):
-        diff_r = (1.0 + r_margin) * 2 * (n + 1)  # determine setting point
-        joint_point = [joint_point_init[0] + diff_r * np.sin(theta),
-                       joint_point_init[1] + diff_r * np.cos(theta),
-                       joint_point_init[2]]
-        # center of z coord
-        zcen = joint_point[2] + sign * (tfin + rfin)
-
-        # x range
-        x = np.linspace(joint_point[0] - tfz * lfan, joint_point[0] + (1.0 - tfz) * lfan, 30)
-
-        # parabola curve parameters => z = a * x** 2 + b * x + c
-        az = sign * (rfin - rfout) / (1 - 2 * tfz) / lfan ** 2
-        bz = -2 * joint_point[0] * az
-        cz = joint_point[2] + bz ** 2 / (4 * az)
+    joint_point_init = [l * jmx + croot * tcx, wf + (b / 2 - wf) * tcy, sign * compute_main_wing_max_z(arg_class)]
+
+    # setting point of every fan along the retreat line(..., nfan)
+    diff_r = (1.0 + r_margin) * 2 * np.arange(1, nfan + 1)
+    joint_x = expand_param(joint_point_init[0]) + diff_r * expand_param(np.sin(theta))
+    joint_y = expand_param(joint_point_init[1]) + diff_r * expand_param(np.cos(theta))
+    joint_z = joint_point_init[2]
 
-        for xi in x:
-            # upper line coords
-            zu = az * xi ** 2 + bz * xi + cz
-            # lower line coords
-            zl = 2 * zcen - zu
+    # center of z coord
+    zcen = joint_z + sign * (tfin + rfin)
 
-            # z range
-            z = np.linspace(zl, zu, 30)
+    # x range of every fan(..., nfan, nx)
+    x = np.linspace(joint_x - expand_param(tfz * lfan), joint_x + expand_param((1.0 - tfz) * lfan), nx, axis=-1)
 
-            # eclipse curve
-            for zi in z:
-                target = np.sqrt((zu - zcen) ** 2 - (zi - zcen) ** 2)
-                yui = joint_point[1] + target
-                yli = joint_point[1] - target
+    # parabola curve parameters => z = a * x** 2 + b * x + c
+    az = expand_param(sign * (rfin - rfout) / (1 - 2 * tfz) / lfan ** 2, 2)
+    bz = -2 * joint_x[..., np.newaxis] * az
+    cz = expand_param(joint_z, 2) + bz ** 2 / (4 * az)
 
-                distributed_fan_arr.append([xi, yui, zi])
-                distributed_fan_arr.append([xi, yli, zi])
-                # symmetric
-                distributed_fan_arr.append([xi, -yui, zi])
-                distributed_fan_arr.append([xi, -yli, zi])
+    # upper line coords
+    zu = az * x ** 2 + bz * x + cz
+    # lower line coords
+    zl = 2 * expand_param(zcen, 2) - zu
 
-    distributed_fan_arr = np.array(distributed_fan_arr)
+    # (..., nfan, nx, nz, 4, 3) points are flattened fan by fan
+    distributed_fan_arr = compute_nacelle(x, zl, zu, expand_param(zcen), joint_y, mirror=True, nz=nz, dtype=dtype)
 
-    return distributed_fan_arr
+    if structured:
+        return distributed_fan_arr
+
+    return flatten_grid(distributed_fan_arr, 4)
 
 
 # distributed electric fan equipping with upper cabin(fuselage)
-def compute_distributed_fan_upper_cabin(arg_class, cabin_arr):
+def compute_distributed_fan_upper_cabin(arg_class, nx=30, nz=30, structured=False, dtype=np.float64):
+    """
+    compute distributed electric fan array, which is equipped at upper cabin
+
+    :param arg_class: argument class
+    :param nx: the number of sections along x axis
+    :param nz: the number of points along z axis at each section
+    :param structured: if True, return structured grid(..., nx, nz, 4 or 2, 3)
+    :param dtype: floating point type of returned array
+    :return: distributed_fan_upp_arr(numpy ndarray)
+    """
     # distributed fan parameters
-    nfan = arg_class.nfan  # the number of distributed electric fan
     rfin = arg_class.rfin  # radius of distributed electric fan
     rfout = arg_class.rfout  # radius of distributed electric fan
-    theta = arg_class.theta * np.pi / 180.0  # retreat angle
     tfin = arg_class.tfin  # margin for connecting a distributed electric fan to wing
     lfan = arg_class.lfan  # overall length of distributed electric fan
     tfz = arg_class.tfz  # z coord constant for joint
@@ -673,8 +817,7 @@ def compute_distributed_fan_upper_cabin(arg_class, cabin_arr):
 
     l = arg_class.l1 + arg_class.l2 + arg_class.l3  # cabin length
 
-    eca = np.max(cabin_arr[:, 1])
-    ecb = np.max(cabin_arr[:, 2])
+    eca, ecb = compute_cabin_max_yz(arg_class)
 
     # distance between cabin center and distributed electric fan center
     r = np.sqrt((eca * np.cos(thetaf)) ** 2 + (ecb * np.sin(thetaf)) ** 2)
@@ -691,43 +834,37 @@ def compute_distributed_fan_upper_cabin(arg_class, cabin_arr):
     cz = joint_point[2] - (rfin + tfin) * np.cos(thetaf) - az * joint_point[0] ** 2 - bz * joint_point[0]
 
     # x range
-    x = np.linspace(joint_point[0] - tfz * lfan, joint_point[0] + (1.0 - tfz) * lfan, 30)
-
-    distributed_fan_upp_arr = []
-
-    for xi in x:
-        # distributed fan outer line
-        zl = az * xi ** 2 + bz * xi + cz
-        zu = zl + (zcen - zl) * 2
-
-        # z range
-        z = np.linspace(zl, zu, 30)
+    x = np.linspace(joint_point[0] - tfz * lfan, joint_point[0] + (1.0 - tfz) * lfan, nx, axis=-1)
 
-        for zi in z:
-            target = np.sqrt((zu - zcen) ** 2 - (zi - zcen) ** 2)
-            yui = joint_point[1] + target
-            yli = joint_point[1] - target
+    # distributed fan outer line
+    zl = expand_param(az) * x ** 2 + expand_param(bz) * x + expand_param(cz)
+    zu = zl + (expand_param(zcen) - zl) * 2
 
-            distributed_fan_upp_arr.append([xi, yui, zi])
-            distributed_fan_upp_arr.append([xi, yli, zi])
+    # the fan on top of cabin(90 deg) has no symmetric pair
+    mirror = pull_common_value(thetaf * 180 / np.pi != 90, 'symmetry of distributed fan(thetaf)')
 
-            if thetaf * 180 / np.pi != 90:
-                distributed_fan_upp_arr.append([xi, -yui, zi])
-                distributed_fan_upp_arr.append([xi, -yli, zi])
+    distributed_fan_upp_arr = compute_nacelle(x, zl, zu, zcen, joint_point[1], mirror=mirror, nz=nz, dtype=dtype)
 
-    distributed_fan_upp_arr = np.array(distributed_fan_upp_arr)
+    if structured:
+        return distributed_fan_upp_arr
 
-    return distributed_fan_upp_arr
+    return flatten_grid(distributed_fan_upp_arr, 3)
 
 
 # compute propeller
 # propeller engine with standard position
-def compute_propeller_with_normal_position(arg_class, cabin_arr):
+def compute_propeller_with_normal_position(arg_class, nz=30, nx=30, arm_nx=30, arm_ny=30, structured=False,
+                                           dtype=np.float64):
     """
     compute propeller array and connected arm array
 
-    :param cabin_arr: numpy array of cabin
-    :param arg_class: argument class
+    :param arg_class: argument class(the number of propellers must be common in a batch)
+    :param nz: the number of sections along z axis of each propeller
+    :param nx: the number of points along x axis at each propeller section
+    :param arm_nx: the number of sections along each arm
+    :param arm_ny: the number of points along y axis at each arm section
+    :param structured: if True, return structured grids(..., 2, n, nz, nx, 2, 3) and (..., arm_nx, arm_ny, n, 2, 3)
+    :param dtype: floating point type of returned array
     :return: propeller_arr, arm_arr
     """
 
@@ -736,127 +873,89 @@ def compute_propeller_with_normal_position(arg_class, cabin_arr):
     l3 = arg_class.l3
 
     # fuselage length
-    l = l1 + l2 + l3
+    l = expand_param(l1 + l2 + l3)
 
     # propeller setting ratio
-    txs = arg_class.txs  # the ratio of setting position corresponding to overall length
-    angles = arg_class.angles  # angle of arm which is connected with a propeller
+    txs = pull_list_param(arg_class.txs, 'txs')  # the ratio of setting position corresponding to overall length
+    angles = pull_list_param(arg_class.angles, 'angles')  # angle of arm which is connected with a propeller
 
     # outer line of the collection of propeller
-    radius = arg_class.radius
+    radius = expand_param(arg_class.radius)
     # the radius of each propeller
-    pr = arg_class.pr
+    pr = expand_param(arg_class.pr)
     # the arm length
-    lp = arg_class.lp
+    lp = expand_param(arg_class.lp)
     # setting shift
-    zdiffp = arg_class.zdiffp
+    zdiffp = expand_param(arg_class.zdiffp)
 
     # setting coefficient for arm on z axis
-    k = arg_class.k
+    k = expand_param(arg_class.k)
 
     # argm radius
-    arm_r = arg_class.arm_r
+    arm_r = expand_param(arg_class.arm_r)
 
     # propeller number(because of symmetric, get the half number of propellers)
-    half_propeller_number = len(txs)
-
-    # coords of joint point
-    joint_points = []
-    for idx in range(half_propeller_number):
-        point = [l * txs[idx], np.max(cabin_arr[:, 1]), idx * zdiffp]
-        joint_points.append(point)
-
-    # coords of propellers at left side
-    propeller_arr_l = []
-    # coords of propellers at right side
-    propeller_arr_r = []
-
-    for angle, joint_point in zip(angles, joint_points):
-        angle = 180 - angle
-        angle = angle * np.pi / 180.0
-        # get center coords
-        center = np.array([joint_point[0] + (radius + pr) * np.cos(angle),
-                           joint_point[1] + (radius + pr) * np.sin(angle),
-                           joint_point[2]])
-
-        # z range
-        z = np.linspace(-k * lp + joint_point[2], (1 - k) * lp + joint_point[2], 30)
-
-        for zi in z:
-
-            # x range(create circle)
-            x = np.linspace(center[0] - pr, center[0] + pr, 30)
-
-            for xi in x:
-                target = np.sqrt(pr ** 2 - (xi - center[0]) ** 2)
-                yui = center[1] + target
-                yli = center[1] - target
-
-                # left side
-                plu = [xi, yui, zi]
-                pll = [xi, yli, zi]
-                propeller_arr_l.append(plu)
-                propeller_arr_l.append(pll)
-
-                # right side
-                pru = [xi, -yui, zi]
-                prl = [xi, -yli, zi]
-                propeller_arr_r.append(pru)
-                propeller_arr_r.append(prl)
-
-
-    propeller_arr_r = np.array(propeller_arr_r)
-    propeller_arr_l = np.array(propeller_arr_l)
-
-    # put together propeller arr
-    propeller_arr = np.concatenate([propeller_arr_l, propeller_arr_r], axis=0)
+    half_propeller_number = txs.shape[-1]
+
+    # coords of joint point(..., n, 3)
+    joint_x = l * txs
+    joint_y = expand_param(compute_cabin_max_yz(arg_class)[0])
+    joint_z = np.arange(half_propeller_number) * zdiffp
+    joint_points = np.stack(np.broadcast_arrays(joint_x, joint_y, joint_z), axis=-1)
+
+    # get center coords of every propeller(..., n)
+    angle = (180 - angles) * np.pi / 180.0
+    center_x = joint_x + (radius + pr) * np.cos(angle)
+    center_y = joint_y + (radius + pr) * np.sin(angle)
+
+    # z range(..., n, nz)
+    z = np.linspace(-k * lp + joint_z, (1 - k) * lp + joint_z, nz, axis=-1)
+    # x range(create circle)(..., n, nx)
+    x = np.linspace(center_x - pr, center_x + pr, nx, axis=-1)
+    target = np.sqrt(np.maximum(pr[..., np.newaxis] ** 2 - (x - center_x[..., np.newaxis]) ** 2, 0.0))
+
+    # coords of propellers(..., left/right, n, nz, nx, upper/lower, xyz), both sides are written into one buffer
+    shape = np.broadcast_shapes(z.shape[:-1], x.shape[:-1], target.shape[:-1], center_y.shape)
+    propeller_arr = np.empty(shape[:-1] + (2,) + shape[-1:] + (nz, nx, 2, 3), dtype=dtype)
+
+    # left side
+    propeller_arr_l = propeller_arr[..., 0, :, :, :, :, :]
+    propeller_arr_l[..., 0] = x[..., np.newaxis, :, np.newaxis]
+    propeller_arr_l[..., 0, 1] = (center_y[..., np.newaxis] + target)[..., np.newaxis, :]
+    propeller_arr_l[..., 1, 1] = (center_y[..., np.newaxis] - target)[..., np.newaxis, :]
+    propeller_arr_l[..., 2] = z[..., np.newaxis, np.newaxis]
+
+    # right side
+    np.multiply(propeller_arr_l, np.array([1, -1, 1], dtype=dtype), out=propeller_arr[..., 1, :, :, :, :, :])
 
     # create arm
-    arm_arr = []
-    # right part
-    x = np.linspace(0, radius + pr, 30)
-    for xi in x:
-        y = np.linspace(-arm_r, arm_r, 30)
-
-        for yi in y:
-            target = np.sqrt(arm_r ** 2 - yi ** 2)
-            zui = target
-            zli = -target
-
-            pu = [xi, yi, zui]
-            pl = [xi, yi, zli]
-
-            for idx in range(half_propeller_number):
-                rep_j = joint_points[idx]
-                angle = angles[idx]
-
-                # turn over 3d on z axis against upper part
-                angle_u = -1 * (180 - angle) * np.pi / 180.0
-                t_arr_u = turnover_3d(angle_u, np.array([0, 0, 1]))
-
-                # turn over 3d on z axis against left part
-                angle_l = 180 * np.pi / 180.0
-                t_arr_l = turnover_3d(angle_l, np.array([0, 0, 1]))
-
-                puu = np.dot(t_arr_u.T, np.array(pu)) + np.array(rep_j)
-                pll = np.dot(t_arr_l.T, puu) + np.array([l, 0, -2 * zdiffp * idx + (half_propeller_number - 1) * zdiffp])
-
-                arm_arr.append(puu.tolist())
-                arm_arr.append(pll.tolist())
-
-    arm_arr = np.array(arm_arr)
-
-    return propeller_arr, arm_arr
-
-
-
-
-
-
-
-
-
-
-
-
-
+    # arm template(upper half of the cylinder along x axis)(..., arm_nx, arm_ny, 3)
+    x = np.linspace(0, radius[..., 0] + pr[..., 0], arm_nx, axis=-1)
+    y = np.linspace(-arm_r[..., 0], arm_r[..., 0], arm_ny, axis=-1)
+    arm_template = np.empty(np.broadcast_shapes(x.shape[:-1], y.shape[:-1]) + (arm_nx, arm_ny, 3))
+    arm_template[..., 0] = x[..., np.newaxis]
+    arm_template[..., 1] = y[..., np.newaxis, :]
+    arm_template[..., 2] = np.sqrt(np.maximum(arm_r ** 2 - y ** 2, 0.0))[..., np.newaxis, :]
+
+    # turn over 3d on z axis against upper part(..., n, 3, 3)
+    z_axis = np.array([0, 0, 1])
+    angles_u = -1 * (180 - angles) * np.pi / 180.0
+    t_arr_u = turnover_3d(angles_u, z_axis)
+    # turn over 3d on z axis against left part
+    t_arr_l = turnover_3d(180 * np.pi / 180.0, z_axis)
+
+    # shift of left part(..., n, 3)
+    shift_z = -2 * zdiffp * np.arange(half_propeller_number) + (half_propeller_number - 1) * zdiffp
+    shift_l = np.stack(np.broadcast_arrays(l, np.zeros(half_propeller_number), shift_z), axis=-1)
+
+    # arm array(..., arm_nx, arm_ny, n, right/left, xyz)
+    arm_arr_u = turnover_points(arm_template, t_arr_u[..., np.newaxis, np.newaxis, :, :, :],
+                                joint_points[..., np.newaxis, np.newaxis, :, :])
+    arm_arr = np.empty(arm_arr_u.shape[:-1] + (2, 3), dtype=dtype)
+    arm_arr[..., 0, :] = arm_arr_u
+    arm_arr[..., 1, :] = turnover_points(arm_arr_u, t_arr_l, shift_l[..., np.newaxis, np.newaxis, :, :])
+
+    if structured:
+        return propeller_arr, arm_arr
+
+    return flatten_grid(propeller_arr, 5), flatten_grid(arm_arr, 4)
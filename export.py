@@ -0,0 +1,229 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+
+# exporters of point cloud(and faces) into ply, xyz or obj
+# every exporter streams components one by one in chunks of points, so the whole aircraft is never held in memory
+# output is written into temporary file in the same directory and replaced with the target file only if export
+# succeeded, so that failed export never leaves truncated file(or destroys previous one)
+
+
+# write points(or faces) in chunks of rows
+def iter_chunks(arr, chunk_size):
+
+    for start in range(0, len(arr), chunk_size):
+        yield arr[start:start + chunk_size]
+
+
+# base class of exporter
+class Exporter(object):
+
+    def __init__(self, fname, binary=True, chunk_size=1 << 16, float_format='%.6f'):
+
+        self.fname = fname
+        self.binary = binary
+        self.chunk_size = chunk_size
+        self.float_format = float_format
+
+        # the number of vertices and faces written so far
+        self.num_vertices = 0
+        self.num_faces = 0
+
+        # temporary file which replaces fname on close
+        self.tmp_fname = '{}.{}.tmp'.format(fname, os.getpid())
+
+    def add_component(self, name, points, faces=None):
+        """
+        write one component
+
+        :param name: component name
+        :param points: point cloud(numpy ndarray, shape (n, 3))
+        :param faces: vertex indices of faces in points(numpy ndarray, shape (m, 3 or 4)), None if it is not available
+        """
+        points = np.asarray(points).reshape(-1, 3)
+
+        self.write_component(name, points, faces)
+
+        self.num_vertices += len(points)
+        if faces is not None:
+            self.num_faces += len(faces)
+
+    def write_component(self, name, points, faces):
+
+        raise NotImplementedError
+
+    # write the rest of file into temporary file and close it(everything staged is dropped if failed)
+    def finish(self, failed):
+
+        pass
+
+    def close(self, failed=False):
+        """
+        finish export
+
+        :param failed: if True, discard everything written so far and leave fname untouched
+        """
+        try:
+            self.finish(failed)
+        except BaseException:
+            self.discard()
+            raise
+
+        if failed:
+            self.discard()
+        else:
+            os.replace(self.tmp_fname, self.fname)
+
+    def discard(self):
+
+        if os.path.exists(self.tmp_fname):
+            os.remove(self.tmp_fname)
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self.close(failed=exc_type is not None)
+
+
+# xyz(points only, one point per line)
+class XYZExporter(Exporter):
+
+    def __init__(self, fname, binary=False, chunk_size=1 << 16, float_format='%.6f'):
+
+        super(XYZExporter, self).__init__(fname, binary=False, chunk_size=chunk_size, float_format=float_format)
+
+        self.f = open(self.tmp_fname, 'wb')
+
+    def write_component(self, name, points, faces):
+
+        for chunk in iter_chunks(points, self.chunk_size):
+            np.savetxt(self.f, chunk, fmt=self.float_format)
+
+    def finish(self, failed):
+
+        self.f.close()
+
+
+# wavefront obj(one object per component, faces refer to the vertices written before)
+class OBJExporter(Exporter):
+
+    def __init__(self, fname, binary=False, chunk_size=1 << 16, float_format='%.6f'):
+
+        super(OBJExporter, self).__init__(fname, binary=False, chunk_size=chunk_size, float_format=float_format)
+
+        self.f = open(self.tmp_fname, 'wb')
+
+    def write_component(self, name, points, faces):
+
+        self.f.write('o {}\n'.format(name).encode())
+
+        for chunk in iter_chunks(points, self.chunk_size):
+            np.savetxt(self.f, chunk, fmt='v {0} {0} {0}'.format(self.float_format))
+
+        if faces is not None:
+            # 1 based global index
+            fmt = 'f' + ' %d' * faces.shape[1]
+            for chunk in iter_chunks(faces, self.chunk_size):
+                np.savetxt(self.f, chunk + self.num_vertices + 1, fmt=fmt)
+
+    def finish(self, failed):
+
+        self.f.close()
+
+
+# stanford ply(ascii or binary little endian)
+# the counts are known only at the end, so vertices and faces are staged in temporary files
+# and put together after the header on close
+class PLYExporter(Exporter):
+
+    def __init__(self, fname, binary=True, chunk_size=1 << 16, float_format='%.6f', dtype='<f8'):
+
+        super(PLYExporter, self).__init__(fname, binary=binary, chunk_size=chunk_size, float_format=float_format)
+
+        self.dtype = np.dtype(dtype)
+        self.face_size = None
+
+        tmp_dir = os.path.dirname(os.path.abspath(fname))
+        self.vertex_f = tempfile.TemporaryFile(dir=tmp_dir)
+        self.face_f = tempfile.TemporaryFile(dir=tmp_dir)
+
+    def write_component(self, name, points, faces):
+
+        for chunk in iter_chunks(points, self.chunk_size):
+            if self.binary:
+                self.vertex_f.write(np.ascontiguousarray(chunk, dtype=self.dtype).tobytes())
+            else:
+                np.savetxt(self.vertex_f, chunk, fmt=self.float_format)
+
+        if faces is None:
+            return
+
+        if self.face_size is None:
+            self.face_size = faces.shape[1]
+        elif self.face_size != faces.shape[1]:
+            raise ValueError('every component must have faces of the same size in one ply file')
+
+        face_dtype = np.dtype([('n', 'u1'), ('vertex_indices', '<i4', (self.face_size,))])
+        for chunk in iter_chunks(faces, self.chunk_size):
+            if self.binary:
+                records = np.empty(len(chunk), dtype=face_dtype)
+                records['n'] = self.face_size
+                records['vertex_indices'] = chunk + self.num_vertices
+                self.face_f.write(records.tobytes())
+            else:
+                fmt = '{}'.format(self.face_size) + ' %d' * self.face_size
+                np.savetxt(self.face_f, chunk + self.num_vertices, fmt=fmt)
+
+    def pull_header(self):
+
+        property_type = 'float' if self.dtype.itemsize == 4 else 'double'
+
+        header = ['ply',
+                  'format {} 1.0'.format('binary_little_endian' if self.binary else 'ascii'),
+                  'element vertex {}'.format(self.num_vertices)]
+        header += ['property {} {}'.format(property_type, axis) for axis in 'xyz']
+        if self.num_faces > 0:
+            header += ['element face {}'.format(self.num_faces),
+                       'property list uchar int vertex_indices']
+        header += ['end_header']
+
+        return ('\n'.join(header) + '\n').encode()
+
+    def finish(self, failed):
+
+        try:
+            if not failed:
+                with open(self.tmp_fname, 'wb') as f:
+                    f.write(self.pull_header())
+
+                    for staged_f in (self.vertex_f, self.face_f):
+                        staged_f.seek(0)
+                        shutil.copyfileobj(staged_f, f)
+        finally:
+            # staged files are deleted on close
+            self.vertex_f.close()
+            self.face_f.close()
+
+
+EXPORTERS = {'.xyz': XYZExporter, '.obj': OBJExporter, '.ply': PLYExporter}
+
+
+def open_exporter(fname, binary=True, chunk_size=1 << 16, **kwargs):
+    """
+    open exporter according to file extension(ply, xyz or obj)
+
+    :param fname: file name
+    :param binary: if True, write binary ply(xyz and obj are always ascii)
+    :param chunk_size: the number of points(or faces) converted at once
+    :return: exporter(use add_component for every component and close, or use it in with statement)
+    """
+    ext = os.path.splitext(fname)[1].lower()
+
+    if ext not in EXPORTERS:
+        raise ValueError('unknown export format: {}'.format(ext))
+
+    return EXPORTERS[ext](fname, binary=binary, chunk_size=chunk_size, **kwargs)
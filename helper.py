@@ -1,7 +1,7 @@
 import numpy as np
 import math
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
+from functools import lru_cache
+from render import POINT_BUDGET, render_png, show_components
 
 # create bezier curve for outer line of aircraft
 def bernstein(n, i, t):
@@ -16,35 +16,180 @@ def bezier(n, t, q):
     return p
 
 
+# binomial coefficients of bernstein polynomial(degree n)
+@lru_cache(maxsize=None)
+def binomial_coefficients(n):
+    coefficients = np.array([math.comb(n, i) for i in range(n + 1)], dtype=float)
+    coefficients.setflags(write=False)
+
+    return coefficients
+
+
+def _bernstein_matrix(n, t):
+    i = np.arange(n + 1)
+    t = t[:, None]
+
+    return binomial_coefficients(n) * t ** i * (1 - t) ** (n - i)
+
+
+# bernstein basis matrix for uniform samples on [0, 1]
+@lru_cache(maxsize=256)
+def bernstein_basis(n, num):
+    """
+    compute bernstein basis matrix for num uniform samples
+
+    :param n: degree of bezier curve
+    :param num: the number of samples of t on [0, 1]
+    :return: basis(numpy ndarray, shape (num, n + 1), read only)
+    """
+    basis = _bernstein_matrix(n, np.linspace(0, 1, num))
+    basis.setflags(write=False)
+
+    return basis
+
+
+# create all points of bezier curve at once
+def bezier_curve(q, t=50):
+    """
+    compute bezier curve points for all parameter values in one pass
+
+    :param q: control points(numpy ndarray, shape (..., n + 1, dim), leading axes are population of curves)
+    :param t: the number of uniform samples on [0, 1] or array of parameter values
+    :return: curve points(numpy ndarray, shape (..., len(t), dim))
+    """
+    q = np.asarray(q, dtype=float)
+    n = q.shape[-2] - 1
+
+    if np.ndim(t) == 0:
+        basis = bernstein_basis(n, int(t))
+    else:
+        basis = _bernstein_matrix(n, np.asarray(t, dtype=float))
+
+    return basis @ q
+
+
+# extrude constant cross section along x axis
+def extrude_section(section, x, flatten=True, dtype=None):
+    """
+    materialize the point cloud of constant cross section placed at every x station
+
+    :param section: yz coords of cross section(numpy ndarray, shape (..., m, 2))
+    :param x: x stations(numpy ndarray, shape (..., n))
+    :param flatten: if False, return structured grid(..., n, m, 3)
+    :param dtype: floating point type of returned array(common type of section and x if it is None)
+    :return: arr(numpy ndarray, shape (..., n * m, 3))
+    """
+    section = np.asarray(section)
+    x = np.asarray(x)
+
+    shape = np.broadcast_shapes(x.shape[:-1], section.shape[:-2]) + (x.shape[-1], section.shape[-2], 3)
+    arr = np.empty(shape, dtype=np.result_type(section, x) if dtype is None else dtype)
+    arr[..., 0] = x[..., np.newaxis]
+    arr[..., 1:] = section[..., np.newaxis, :, :]
+
+    if not flatten:
+        return arr
+
+    return arr.reshape(shape[:-3] + (-1, 3))
+
+
+# faces of structured grid
+def grid_faces(grid_shape, grid_axes=(0, 1), triangles=False):
+    """
+    compute vertex indices of faces which connect neighbor points of structured grid
+
+    every (u, v) cell on grid_axes becomes one quad(or two triangles),
+    the other axes are sheets(e.g. upper/lower) which are not connected each other
+
+    :param grid_shape: shape of grid(xyz axis is not included)
+    :param grid_axes: surface axes(u, v) in grid_shape
+    :param triangles: if True, split every quad into two triangles
+    :return: faces(numpy ndarray, shape (m, 4) or (2 * m, 3)), indices are in flattened grid order
+    """
+    idx = np.arange(int(np.prod(grid_shape))).reshape(grid_shape)
+    idx = np.moveaxis(idx, grid_axes, (-2, -1))
+
+    # corners of every cell in cyclic order
+    faces = np.stack([idx[..., :-1, :-1], idx[..., 1:, :-1], idx[..., 1:, 1:], idx[..., :-1, 1:]], axis=-1)
+    faces = faces.reshape(-1, 4)
+
+    if triangles:
+        return faces[:, [0, 1, 2, 0, 2, 3]].reshape(-1, 3)
+
+    return faces
+
+
 # 3d turnover operation
 def turnover_3d(theta, n):
+    """
+    compute turnover(rotation) matrix around axis n
+
+    theta and n may be arrays, then a stack of matrices is returned
 
+    :param theta: turnover angle [rad](scalar or shape (k,))
+    :param n: unit vector of axis(shape (3,) or (k, 3))
+    :return: t_arr(numpy ndarray, shape (3, 3) or (k, 3, 3))
+    """
     # theta has already finished converting radians
-    t_arr = np.array([[np.cos(theta) + n[0] ** 2 * (1 - np.cos(theta)),
-                       n[0] * n[1] * (1 - np.cos(theta)) - n[2] * np.sin(theta),
-                       n[2] * n[1] * (1 - np.cos(theta)) + n[1] * np.sin(theta)],
-                      [n[0] * n[1] * (1 - np.cos(theta)) + n[2] * np.sin(theta),
-                       np.cos(theta) + n[1] ** 2 * (1 - np.cos(theta)),
-                       n[1] * n[2] * (1 - np.cos(theta)) - n[0] * np.sin(theta)],
-                      [n[2] * n[0] * (1 - np.cos(theta)) - n[1] * np.sin(theta),
-                       n[1] * n[2] * (1 - np.cos(theta)) + n[0] * np.sin(theta),
-                       np.cos(theta) + n[2] ** 2 * (1 - np.cos(theta))]])
+    theta = np.asarray(theta, dtype=float)
+    n = np.asarray(n, dtype=float)
+
+    cos = np.cos(theta)
+    sin = np.sin(theta)
+    ver = 1 - cos
+    nx, ny, nz = n[..., 0], n[..., 1], n[..., 2]
+
+    t_arr = np.empty(np.broadcast_shapes(theta.shape, n.shape[:-1]) + (3, 3))
+    t_arr[..., 0, 0] = cos + nx ** 2 * ver
+    t_arr[..., 0, 1] = nx * ny * ver - nz * sin
+    t_arr[..., 0, 2] = nx * nz * ver + ny * sin
+    t_arr[..., 1, 0] = nx * ny * ver + nz * sin
+    t_arr[..., 1, 1] = cos + ny ** 2 * ver
+    t_arr[..., 1, 2] = ny * nz * ver - nx * sin
+    t_arr[..., 2, 0] = nz * nx * ver - ny * sin
+    t_arr[..., 2, 1] = ny * nz * ver + nx * sin
+    t_arr[..., 2, 2] = cos + nz ** 2 * ver
 
     return t_arr
 
 
-# draw function
-def draw_aircraft(component_dict, axis_bounds):
+# turn over and shift point cloud at once
+def turnover_points(points, t_arr, shift=0.0):
+    """
+    apply turnover matrix(transposed, as np.dot(t_arr.T, p)) and shift to every point
+
+    if t_arr is a stack, every point is turned over by every matrix
+    (leading axes of the stack are broadcast against those of points)
 
-    fig = plt.figure()
-    ax = Axes3D(fig)
+    :param points: point cloud(numpy ndarray, shape (..., 3))
+    :param t_arr: turnover matrix(shape (3, 3)) or stack of matrices(shape (..., k, 3, 3))
+    :param shift: translation added after turnover(shape (3,) or (..., k, 3))
+    :return: turned points(numpy ndarray, shape (..., 3) or (..., k, 3))
+    """
+    points = np.asarray(points)
+    t_arr = np.asarray(t_arr)
 
-    for name, arr in component_dict.items():
+    if t_arr.ndim == 2:
+        return points @ t_arr + shift
 
-        ax.scatter(arr[:, 0], arr[:, 1], arr[:, 2])
+    return np.einsum('...kji,...j->...ki', t_arr, points) + shift
 
-    ax.set_xlim(axis_bounds[0])
-    ax.set_ylim(axis_bounds[1])
-    ax.set_zlim(axis_bounds[2])
 
-    plt.show()
+# draw function
+def draw_aircraft(component_dict, axis_bounds=None, grid_layouts=None, point_budget=POINT_BUDGET, fname=None,
+                  block=True):
+    """
+    draw components of aircraft(surfaces for structured grids, decimated points for point clouds)
+
+    :param component_dict: dictionary of component name and array
+    :param axis_bounds: axis bounds [[xmin, xmax], [ymin, ymax], [zmin, zmax]], None means automatic
+    :param grid_layouts: dictionary of component name and (the number of grid axes, surface axes) of structured grid
+    :param point_budget: the number of points drawn at most
+    :param fname: if given, render offscreen into png file instead of opening window
+    :param block: if False, return without waiting for the window to be closed
+    """
+    if fname is not None:
+        render_png(fname, component_dict, grid_layouts=grid_layouts, bounds=axis_bounds, point_budget=point_budget)
+    else:
+        show_components(component_dict, grid_layouts=grid_layouts, bounds=axis_bounds, point_budget=point_budget,
+                        block=block)
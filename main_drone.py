@@ -1,7 +1,9 @@
 import argparse
-import pandas as pd
 from component import compute_cockpit_arr, compute_cabin_arr, compute_after_cabin_arr
 from component import compute_propeller_with_normal_position
+from component import pull_resolution, pull_dtype
+from cache import GeometryCache, compute_geometry
+from arguments import AircraftParameters, read_parameters
 from helper import draw_aircraft
 
 # load arguments
@@ -11,6 +13,13 @@ def load_args():
     parser.add_argument('--aircraft_type', default='drone', type=str,
                         help='1. normal, 2. drone, 3. distributed fan, 4. blended wing body, 5. hyper sonic, 6. propeller')
     parser.add_argument('--engine_type', default='propeller', type=str, help='1. turbofan 2. propeller')
+    # geometry cache(disabled if it is not given)
+    parser.add_argument('--cache_dir', default=None, type=str, help='directory of geometry cache')
+    # level of detail
+    parser.add_argument('--lod', default='standard', type=str, help='1. preview, 2. standard, 3. export')
+    # floating point type of geometry(follows level of detail if it is not given)
+    parser.add_argument('--dtype', default=None, type=str, help='1. float32, 2. float64')
+
     args = parser.parse_args()
 
     return args
@@ -69,42 +78,21 @@ def insert_args():
 
 
 # Argument class(To manage database parameters)
-class Arguments(object):
+class Arguments(AircraftParameters):
+
+    __slots__ = ()
 
     def __init__(self, args):
 
-        cname = args.cname
+        super(Arguments, self).__init__()
 
+        cname = args.cname
         fname = './AircraftData/{}.csv'.format(cname)
 
-        df = pd.read_csv(fname)
-        self.huc = df['huc'].values[0]
-        self.hlc = df['hlc'].values[0]
-        self.wc = df['wc'].values[0]
-
-        self.hlf = df['hlf'].values[0]
-        self.huf = df['huf'].values[0]
-        self.wf = df['wf'].values[0]
-
-        self.hau = df['hau'].values[0]
-        self.wa = df['wa'].values[0]
-
-        self.l1 = df['l1'].values[0]
-        self.l2 = df['l2'].values[0]
-        self.l3 = df['l3'].values[0]
-
-        self.uk = df['uk'].values[0]
-        txs = [float(a) for a in df['txs'].values[0].split('/')]
-        self.txs = txs
-        angles = [int(a) for a in df['angles'].values[0].split('/')]
-        self.angles = angles
+        read_parameters(fname, params=self)
 
-        self.radius = df['radius'].values[0]
-        self.pr = df['pr'].values[0]
-        self.lp = df['lp'].values[0]
-        self.zdiffp = df['zdiffp'].values[0]
-        self.k = df['k'].values[0]
-        self.arm_r = df['arm_r'].values[0]
+        self.aircraft_type = args.aircraft_type
+        self.engine_type = args.engine_type
 
 
 if __name__ == '__main__':
@@ -123,20 +111,32 @@ if __name__ == '__main__':
 
     if mode == 'insert':
         args = insert_args()
+        cache = None
+        lod = 'standard'
+        dtype = pull_dtype(lod)
 
     else:
         l_args = load_args()
         args = Arguments(l_args)
+        # geometry cache(disabled if it is not given)
+        cache = GeometryCache(l_args.cache_dir) if l_args.cache_dir is not None else None
+        # level of detail
+        lod = l_args.lod
+        dtype = pull_dtype(lod, l_args.dtype)
 
     # cockpit arr
-    cockpit_arr = compute_cockpit_arr(args)
+    cockpit_arr = compute_geometry(compute_cockpit_arr, args, cache=cache, dtype=dtype,
+                                   **pull_resolution(compute_cockpit_arr, lod))
     # cabin arr
-    cabin_arr = compute_cabin_arr(args)
+    cabin_arr = compute_geometry(compute_cabin_arr, args, cache=cache, dtype=dtype,
+                                 **pull_resolution(compute_cabin_arr, lod))
     # after cabin arr
-    after_cabin_arr = compute_after_cabin_arr(args)
+    after_cabin_arr = compute_geometry(compute_after_cabin_arr, args, cache=cache, dtype=dtype,
+                                       **pull_resolution(compute_after_cabin_arr, lod))
 
     # propeller
-    propeller_arr, arm_arr = compute_propeller_with_normal_position(args, cabin_arr)
+    propeller_arr, arm_arr = compute_geometry(compute_propeller_with_normal_position, args, cache=cache, dtype=dtype,
+                                              **pull_resolution(compute_propeller_with_normal_position, lod))
 
     # component names
     component_names = ['cockpit', 'cabin', 'after_cabin', 'propeller', 'arm']
@@ -150,8 +150,8 @@ if __name__ == '__main__':
         component_dict[key] = val
 
     # draw aircraft
-    axis_bounds = [[-2, 8], [-5, 5], [-5, 5]]
-    draw_aircraft(component_dict, axis_bounds)
+    # axis bounds are taken from bounding box of components
+    draw_aircraft(component_dict)
 
         
 
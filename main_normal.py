@@ -1,17 +1,25 @@
 import numpy as np
 import argparse
-import pandas as pd
 from component import compute_cockpit_arr, compute_cabin_arr, compute_after_cabin_arr
 from component import compute_main_wing_arr, compute_horizontal_wing, compute_vertical_wing
 from component import compute_engine_lower_main_wing, compute_engine_upper_main_wing, compute_engine_upper_cabin
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
+from component import pull_resolution, pull_dtype
+from cache import GeometryCache, compute_geometry
+from arguments import AircraftParameters, read_parameters
+from helper import draw_aircraft
 
 # load arguments
 def load_args():
     parser = argparse.ArgumentParser()
     parser.add_argument('--cname', default='a320', type=str)
 
+    # geometry cache(disabled if it is not given)
+    parser.add_argument('--cache_dir', default=None, type=str, help='directory of geometry cache')
+    # level of detail
+    parser.add_argument('--lod', default='standard', type=str, help='1. preview, 2. standard, 3. export')
+    # floating point type of geometry(follows level of detail if it is not given)
+    parser.add_argument('--dtype', default=None, type=str, help='1. float32, 2. float64')
+
     args = parser.parse_args()
 
     return args
@@ -97,86 +105,18 @@ def insert_args():
 
 
 # Argument class(To manage database parameters)
-class Arguments(object):
+class Arguments(AircraftParameters):
+
+    __slots__ = ()
 
     def __init__(self, args):
 
-        cname = args.cname
+        super(Arguments, self).__init__()
 
+        cname = args.cname
         fname = './AircraftData/{}.csv'.format(cname)
 
-        df = pd.read_csv(fname, index_col=0)
-        self.aircraft_type = df['aircraft_type'].values[0]
-        self.engine_settings = df['engine_settings'].values[0]
-        self.huc = df['huc'].values[0]
-        self.hlc = df['hlc'].values[0]
-        self.wc = df['wc'].values[0]
-
-        self.hlf = df['hlf'].values[0]
-        self.huf = df['huf'].values[0]
-        self.wf = df['wf'].values[0]
-
-        self.hau = df['hau'].values[0]
-        self.wa = df['wa'].values[0]
-
-        self.l1 = df['l1'].values[0]
-        self.l2 = df['l2'].values[0]
-        self.l3 = df['l3'].values[0]
-
-        self.uk = df['uk'].values[0]
-
-        self.ctip = df['ctip'].values[0]
-        self.croot = df['croot'].values[0]
-        self.b = df['b'].values[0]
-        self.theta = df['theta'].values[0]
-        self.jmx = df['jmx'].values[0]
-        self.jmz = df['jmz'].values[0]
-        self.pm = df['pm'].values[0]
-        self.tcm = df['tcm'].values[0]
-
-        self.chtip = df['chtip'].values[0]
-        self.chroot = df['chroot'].values[0]
-        self.bh = df['bh'].values[0]
-        self.thetah = df['thetah'].values[0]
-        self.jhx = df['jhx'].values[0]
-        self.jhz = df['jhz'].values[0]
-        self.ph = df['ph'].values[0]
-        self.tch = df['tch'].values[0]
-
-        self.cvtip = df['cvtip'].values[0]
-        self.cvroot = df['cvroot'].values[0]
-        self.bv = df['bv'].values[0]
-        self.thetav = df['thetav'].values[0]
-        self.jvx = df['jvx'].values[0]
-        self.jvz = df['jvz'].values[0]
-        self.pv = df['pv'].values[0]
-        self.tcv = df['tcv'].values[0]
-
-        self.rein = df['rein'].values[0]
-        self.reout = df['reout'].values[0]
-        self.tein = df['tein'].values[0]
-        self.le = df['le'].values[0]
-        self.tcx = df['tcx'].values[0]
-        self.tcy = df['tcy'].values[0]
-        self.tcz = df['tcz'].values[0]
-        self.thetae = df['thetae'].values[0]
-
-
-# draw function
-def draw_aircraft(component_dict, axis_bounds):
-
-    fig = plt.figure()
-    ax = Axes3D(fig)
-
-    for name, arr in component_dict.items():
-
-        ax.scatter(arr[:, 0], arr[:, 1], arr[:, 2])
-
-    ax.set_xlim(axis_bounds[0])
-    ax.set_ylim(axis_bounds[1])
-    ax.set_zlim(axis_bounds[2])
-
-    plt.show()
+        read_parameters(fname, params=self)
 
 
 if __name__ == '__main__':
@@ -197,34 +137,51 @@ if __name__ == '__main__':
 
     if mode == 'insert':
         args = insert_args()
+        cache = None
+        lod = 'standard'
+        dtype = pull_dtype(lod)
 
     else:
         l_args = load_args()
         args = Arguments(l_args)
+        # geometry cache(disabled if it is not given)
+        cache = GeometryCache(l_args.cache_dir) if l_args.cache_dir is not None else None
+        # level of detail
+        lod = l_args.lod
+        dtype = pull_dtype(lod, l_args.dtype)
 
     # main
     # build cockpit array
-    cockpit_arr = compute_cockpit_arr(args)
+    cockpit_arr = compute_geometry(compute_cockpit_arr, args, cache=cache, dtype=dtype,
+                                   **pull_resolution(compute_cockpit_arr, lod))
     # build cabin array
-    cabin_arr = compute_cabin_arr(args)
+    cabin_arr = compute_geometry(compute_cabin_arr, args, cache=cache, dtype=dtype,
+                                 **pull_resolution(compute_cabin_arr, lod))
     # build after cabin array
-    after_cabin_arr = compute_after_cabin_arr(args)
+    after_cabin_arr = compute_geometry(compute_after_cabin_arr, args, cache=cache, dtype=dtype,
+                                       **pull_resolution(compute_after_cabin_arr, lod))
     # build main wing array
-    main_wing_arr = compute_main_wing_arr(args)
+    main_wing_arr = compute_geometry(compute_main_wing_arr, args, cache=cache, dtype=dtype,
+                                     **pull_resolution(compute_main_wing_arr, lod))
     # build horizontal wing array
-    hori_wing_arr = compute_horizontal_wing(args)
+    hori_wing_arr = compute_geometry(compute_horizontal_wing, args, cache=cache, dtype=dtype,
+                                     **pull_resolution(compute_horizontal_wing, lod))
     # build vertical wing array
-    vert_wing_arr = compute_vertical_wing(args)
+    vert_wing_arr = compute_geometry(compute_vertical_wing, args, cache=cache, dtype=dtype,
+                                     **pull_resolution(compute_vertical_wing, lod))
 
     # engine part
     if args.engine_settings == 'lower_mainwing':
-        engine_arr = compute_engine_lower_main_wing(args, main_wing_arr)
+        engine_arr = compute_geometry(compute_engine_lower_main_wing, args, cache=cache, dtype=dtype,
+                                      **pull_resolution(compute_engine_lower_main_wing, lod))
 
     elif args.engine_settings == 'upper_mainwing':
-        engine_arr = compute_engine_upper_main_wing(args, main_wing_arr)
+        engine_arr = compute_geometry(compute_engine_upper_main_wing, args, cache=cache, dtype=dtype,
+                                      **pull_resolution(compute_engine_upper_main_wing, lod))
 
     elif args.engine_settings == 'upper_cabin':
-        engine_arr = compute_engine_upper_cabin(args, cabin_arr)
+        engine_arr = compute_geometry(compute_engine_upper_cabin, args, cache=cache, dtype=dtype,
+                                      **pull_resolution(compute_engine_upper_cabin, lod))
 
     # component names
     component_names = ['cockpit', 'cabin', 'after_cabin', 'main_wing', 'hori_wing', 'vert_wing', 'engine']
@@ -238,8 +195,8 @@ if __name__ == '__main__':
         component_dict[key] = val
 
     # draw aircraft
-    axis_bounds = [[-10, 40], [-20, 20], [-15, 15]]
-    draw_aircraft(component_dict, axis_bounds)
+    # axis bounds are taken from bounding box of components
+    draw_aircraft(component_dict)
 
 
 
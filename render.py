@@ -0,0 +1,214 @@
+import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+from bbox import bounding_box, merge_bounding_boxes, pull_axis_bounds
+
+# rendering backend of aircraft components
+# structured grids are drawn as surfaces(one Poly3DCollection per component) and point clouds as one scatter,
+# both decimated so that the whole aircraft stays under point budget
+# offscreen rendering uses Agg canvas directly, so no display(and no pyplot window) is required
+
+# the number of points drawn for whole aircraft at most(None means no decimation)
+POINT_BUDGET = 20000
+
+
+# colors of components(matplotlib default color cycle)
+def pull_colors():
+
+    return matplotlib.rcParams['axes.prop_cycle'].by_key()['color']
+
+
+# take every stride-th index along axis, keeping the last one so that surface is not shortened
+def decimate_axis(arr, axis, stride):
+
+    num = arr.shape[axis]
+    if stride <= 1 or num <= 2:
+        return arr
+
+    idx = np.arange(0, num, stride)
+    if idx[-1] != num - 1:
+        idx = np.append(idx, num - 1)
+
+    return np.take(arr, idx, axis=axis)
+
+
+# the number of points of component(grid or point cloud)
+def count_points(arr):
+
+    return np.size(arr) // 3
+
+
+# stride of each surface axis which fits the number of points into budget
+def pull_grid_stride(num_points, point_budget):
+
+    if point_budget is None or num_points <= point_budget:
+        return 1
+
+    return int(np.ceil(np.sqrt(num_points / point_budget)))
+
+
+# stride of point cloud which fits the number of points into budget
+def pull_point_stride(num_points, point_budget):
+
+    if point_budget is None or num_points <= point_budget:
+        return 1
+
+    return int(np.ceil(num_points / point_budget))
+
+
+def grid_polygons(grid_arr, grid_ndim, grid_axes=(0, 1), stride=1):
+    """
+    quads which connect neighbor points of structured grid(the same order as helper.grid_faces)
+
+    :param grid_arr: structured grid(numpy ndarray, shape (..., *grid, 3))
+    :param grid_ndim: the number of grid axes
+    :param grid_axes: surface axes in grid axes
+    :param stride: decimation stride of each surface axis
+    :return: quads(numpy ndarray, shape (m, 4, 3))
+    """
+    surface_axes = [grid_arr.ndim - 1 - grid_ndim + axis for axis in grid_axes]
+    grid_arr = np.moveaxis(grid_arr, surface_axes, (-3, -2))
+    grid_arr = decimate_axis(decimate_axis(grid_arr, -3, stride), -2, stride)
+
+    quads = np.stack([grid_arr[..., :-1, :-1, :], grid_arr[..., 1:, :-1, :],
+                      grid_arr[..., 1:, 1:, :], grid_arr[..., :-1, 1:, :]], axis=-2)
+
+    return quads.reshape(-1, 4, 3)
+
+
+def draw_components(ax, components, grid_layouts=None, point_budget=POINT_BUDGET, shade=True):
+    """
+    draw components on 3d axes
+
+    :param ax: 3d axes
+    :param components: dictionary of component name and array(structured grid if its layout is given,
+                       otherwise point cloud of shape (n, 3)), None is skipped
+    :param grid_layouts: dictionary of component name and (the number of grid axes, surface axes)
+    :param point_budget: the number of points drawn at most(None means no decimation)
+    :param shade: if True, shade surfaces by their normals
+    :return: dictionary of component name and artist
+    """
+    grid_layouts = grid_layouts or {}
+    components = {name: arr for name, arr in components.items() if arr is not None and count_points(arr) > 0}
+
+    # every component is decimated with the same stride, so that their densities stay comparable
+    num_points = sum(count_points(arr) for arr in components.values())
+    grid_stride = pull_grid_stride(num_points, point_budget)
+    point_stride = pull_point_stride(num_points, point_budget)
+
+    colors = pull_colors()
+    artists = {}
+    for idx, (name, arr) in enumerate(components.items()):
+        color = colors[idx % len(colors)]
+
+        if name in grid_layouts:
+            grid_ndim, grid_axes = grid_layouts[name]
+            quads = grid_polygons(np.asarray(arr), grid_ndim, grid_axes, stride=grid_stride)
+            artist = Poly3DCollection(quads, facecolors=color, edgecolors=color, linewidths=0, shade=shade)
+            ax.add_collection3d(artist)
+        else:
+            points = np.asarray(arr).reshape(-1, 3)[::point_stride]
+            artist = ax.scatter(points[:, 0], points[:, 1], points[:, 2], s=1, color=color, depthshade=False)
+
+        artists[name] = artist
+
+    return artists
+
+
+# axis bounds which show every component
+def pull_component_bounds(components, grid_layouts=None):
+
+    grid_layouts = grid_layouts or {}
+    bboxes = [bounding_box(np.asarray(arr), grid_layouts[name][0] if name in grid_layouts else 1)
+              for name, arr in components.items() if arr is not None and count_points(arr) > 0]
+    bbox = merge_bounding_boxes(bboxes)
+
+    if bbox is None:
+        return None
+
+    return pull_axis_bounds(bbox)
+
+
+# set axis bounds with the same scale on every axis
+def set_bounds(ax, bounds):
+
+    if bounds is None:
+        return
+
+    ax.set_xlim(bounds[0])
+    ax.set_ylim(bounds[1])
+    ax.set_zlim(bounds[2])
+
+    # flat component(e.g. propeller disk seen edge on) must not collapse the box
+    extents = np.array([high - low for low, high in bounds], dtype=float)
+    ax.set_box_aspect(np.maximum(extents, 1e-3 * np.max(extents)))
+
+
+def create_offscreen_axes(figsize=(8, 6), dpi=100):
+    """
+    create figure and 3d axes on Agg canvas(no display is required)
+
+    :param figsize: figure size in inch
+    :param dpi: dots per inch
+    :return: figure, axes
+    """
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(projection='3d')
+
+    return fig, ax
+
+
+def render_png(fname, components, grid_layouts=None, bounds=None, title=None, elev=None, azim=None,
+               point_budget=POINT_BUDGET, figsize=(8, 6), dpi=100):
+    """
+    render components offscreen into png file
+
+    :param fname: file name
+    :param components: dictionary of component name and array(see draw_components)
+    :param grid_layouts: dictionary of component name and (the number of grid axes, surface axes)
+    :param bounds: axis bounds [[xmin, xmax], [ymin, ymax], [zmin, zmax]], None means bounding box of components
+    :param title: axes title
+    :param elev: elevation angle of view
+    :param azim: azimuth angle of view
+    :param point_budget: the number of points drawn at most
+    :param figsize: figure size in inch
+    :param dpi: dots per inch
+    """
+    fig, ax = create_offscreen_axes(figsize=figsize, dpi=dpi)
+
+    draw_components(ax, components, grid_layouts=grid_layouts, point_budget=point_budget)
+    set_bounds(ax, bounds if bounds is not None else pull_component_bounds(components, grid_layouts))
+    ax.view_init(elev=elev, azim=azim)
+    if title is not None:
+        ax.set_title(title)
+
+    fig.savefig(fname)
+
+
+def show_components(components, grid_layouts=None, bounds=None, title=None, point_budget=POINT_BUDGET, block=True):
+    """
+    draw components in interactive window
+
+    :param components: dictionary of component name and array(see draw_components)
+    :param grid_layouts: dictionary of component name and (the number of grid axes, surface axes)
+    :param bounds: axis bounds [[xmin, xmax], [ymin, ymax], [zmin, zmax]], None means bounding box of components
+    :param title: axes title
+    :param point_budget: the number of points drawn at most
+    :param block: if False, return without waiting for the window to be closed
+    :return: figure, axes
+    """
+    fig = plt.figure()
+    ax = fig.add_subplot(projection='3d')
+
+    draw_components(ax, components, grid_layouts=grid_layouts, point_budget=point_budget)
+    set_bounds(ax, bounds if bounds is not None else pull_component_bounds(components, grid_layouts))
+    if title is not None:
+        ax.set_title(title)
+
+    plt.show(block=block)
+
+    return fig, ax
@@ -0,0 +1,140 @@
+import os
+import json
+import struct
+import numpy as np
+
+# point cloud store file
+# magic(8 bytes) | header length(uint64, little endian) | json header | padding | component data(aligned)
+# header => {'meta': {...}, 'components': {name: {'offset': int, 'shape': [...], 'dtype': str}}}
+MAGIC = b'ACPCLD01'
+ALIGNMENT = 64
+
+
+# round up to alignment
+def align(offset, alignment=ALIGNMENT):
+
+    return (offset + alignment - 1) // alignment * alignment
+
+
+# data size of component in offset table
+def pull_nbytes(entry):
+
+    return int(np.prod(entry['shape'])) * np.dtype(entry['dtype']).itemsize
+
+
+# build header and offset table of components
+def build_header(components, meta=None):
+    """
+    :param components: dictionary of component name and numpy ndarray(None is skipped)
+    :param meta: json serializable dictionary(e.g. aircraft name)
+    :return: header bytes(padded to alignment), offset table
+    """
+    table = {}
+    for name, arr in components.items():
+        if arr is None:
+            continue
+        table[name] = {'shape': list(arr.shape), 'dtype': np.dtype(arr.dtype).newbyteorder('<').str}
+
+    # offsets depend on header length, so header is rebuilt until its length is fixed
+    data_start = align(len(MAGIC) + 8)
+    while True:
+        offset = data_start
+        for name in table:
+            table[name]['offset'] = offset
+            offset = align(offset + pull_nbytes(table[name]))
+
+        header = json.dumps({'meta': meta or {}, 'components': table}, sort_keys=True).encode()
+        if align(len(MAGIC) + 8 + len(header)) <= data_start:
+            break
+        data_start = align(len(MAGIC) + 8 + len(header))
+
+    prefix = MAGIC + struct.pack('<Q', len(header)) + header
+
+    return prefix + b'\0' * (data_start - len(prefix)), table
+
+
+def write_point_cloud(fname, components, meta=None):
+    """
+    write components of one aircraft(or stacked population) into one binary file
+
+    :param fname: file name
+    :param components: dictionary of component name and numpy ndarray(None is skipped)
+    :param meta: json serializable dictionary(e.g. aircraft name)
+    :return: offset table
+    """
+    header, table = build_header(components, meta)
+
+    tmp_fname = '{}.{}.tmp'.format(fname, os.getpid())
+    with open(tmp_fname, 'wb') as f:
+        f.write(header)
+
+        for name, entry in table.items():
+            f.seek(entry['offset'])
+            np.asarray(components[name], dtype=entry['dtype']).tofile(f)
+
+        # file must cover the end of every component(including empty ones)
+        f.truncate(max([f.tell()] + [entry['offset'] + pull_nbytes(entry) for entry in table.values()]))
+
+    os.replace(tmp_fname, fname)
+
+    return table
+
+
+class PointCloudStore(object):
+    """
+    point cloud store opened via np.memmap, every component is a zero copy read only view on the file
+    """
+
+    def __init__(self, fname):
+
+        self.fname = fname
+
+        with open(fname, 'rb') as f:
+            magic = f.read(len(MAGIC))
+            if magic != MAGIC:
+                raise ValueError('{} is not a point cloud store'.format(fname))
+            header_length, = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(header_length).decode())
+
+        self.meta = header['meta']
+        self.table = header['components']
+        self._mm = np.memmap(fname, dtype=np.uint8, mode='r')
+
+    @property
+    def names(self):
+
+        return list(self.table)
+
+    def __contains__(self, name):
+
+        return name in self.table
+
+    def __getitem__(self, name):
+
+        entry = self.table[name]
+
+        return np.ndarray(tuple(entry['shape']), dtype=entry['dtype'], buffer=self._mm, offset=entry['offset'])
+
+    def get(self, name, default=None):
+
+        if name not in self.table:
+            return default
+
+        return self[name]
+
+    def close(self):
+
+        self._mm = None
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *exc):
+
+        self.close()
+
+
+def open_point_cloud(fname):
+
+    return PointCloudStore(fname)
@@ -0,0 +1,419 @@
+import os
+import time
+import copy
+import argparse
+import numpy as np
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from arguments import PARAMETER_TYPES, read_parameters
+from view import AircraftView
+from component import pull_dtype
+
+
+# load arguments
+def load_args():
+    parser = argparse.ArgumentParser()
+
+    # base aircraft
+    parser.add_argument('--base', default='./AircraftData/a320.csv', type=str, help='database file of base aircraft')
+    parser.add_argument('--row', default=0, type=int, help='row index of base aircraft in database')
+    parser.add_argument('--aircraft_type', default='normal', type=str,
+                        help='used if database does not have it, 1. normal, 2. drone')
+    parser.add_argument('--engine_type', default='turbofan', type=str,
+                        help='used if database does not have it, 1. turbofan 2. propeller')
+
+    # design space
+    parser.add_argument('--ranges', nargs='+', default=['b=30:50:5', 'theta=15:35:5'], type=str,
+                        help='parameter ranges written as name=low:high(:num for grid), e.g. b=30:50:5')
+    parser.add_argument('--sampling', default='grid', type=str, help='1. grid, 2. random, 3. lhs(latin hypercube)')
+    parser.add_argument('--num_samples', default=100, type=int, help='the number of samples(random, lhs)')
+    parser.add_argument('--seed', default=0, type=int, help='random seed(random, lhs)')
+    parser.add_argument('--components', nargs='+', default=None, type=str,
+                        help='component names to generate(all components of aircraft type if it is not given)')
+    parser.add_argument('--lod', default='standard', type=str,
+                        help='level of detail, 1. preview, 2. standard, 3. export')
+    parser.add_argument('--dtype', default=None, type=str,
+                        help='floating point type of geometry(follows level of detail if it is not given)')
+
+    # execution
+    parser.add_argument('--workers', default=None, type=int, help='the number of processes(all cores if not given)')
+    parser.add_argument('--chunk_size', default=256, type=int, help='the number of aircraft per chunk(file)')
+    parser.add_argument('--out_dir', default='./SweepResult', type=str, help='directory of result chunks')
+    parser.add_argument('--transport', default='npz', type=str,
+                        help='1. npz(one file per chunk), '
+                             '2. npy(workers write into one memory mapped file per component)')
+
+    args = parser.parse_args()
+
+    return args
+
+
+# parameter range written as 'name=low:high[:num]'
+def parse_range(text):
+    """
+    parse parameter range
+
+    :param text: range string(e.g. 'b=30:50:5')
+    :return: name, low, high, num(None if it is not given)
+    """
+    name, _, bounds = text.partition('=')
+    bounds = bounds.split(':')
+
+    if name not in PARAMETER_TYPES or PARAMETER_TYPES[name] is not float:
+        raise ValueError('{} is not a continuous aircraft parameter'.format(name))
+    if len(bounds) not in (2, 3):
+        raise ValueError('parameter range must be written as name=low:high[:num], got {}'.format(text))
+
+    num = int(bounds[2]) if len(bounds) == 3 else None
+
+    return name, float(bounds[0]), float(bounds[1]), num
+
+
+# full factorial design
+def grid_samples(ranges):
+
+    for name, _, _, num in ranges:
+        if num is None:
+            raise ValueError('the number of levels of {} is required for grid sampling'.format(name))
+
+    levels = [np.linspace(low, high, num) for _, low, high, num in ranges]
+    grid = np.meshgrid(*levels, indexing='ij')
+
+    return {r[0]: g.ravel() for r, g in zip(ranges, grid)}
+
+
+# uniform random design
+def random_samples(ranges, num_samples, rng):
+
+    return {name: rng.uniform(low, high, num_samples) for name, low, high, _ in ranges}
+
+
+# latin hypercube design(every parameter range is divided into num_samples strata which are used once)
+def latin_hypercube_samples(ranges, num_samples, rng):
+
+    samples = {}
+    for name, low, high, _ in ranges:
+        u = (rng.permutation(num_samples) + rng.random(num_samples)) / num_samples
+        samples[name] = low + (high - low) * u
+
+    return samples
+
+
+# design samples of every parameter range
+def compute_samples(ranges, sampling='grid', num_samples=100, seed=0):
+    """
+    compute design samples
+
+    :param ranges: list of (name, low, high, num)
+    :param sampling: sampling method(grid, random or lhs)
+    :param num_samples: the number of samples(random, lhs)
+    :param seed: random seed(random, lhs)
+    :return: samples(dictionary of parameter name and numpy ndarray of shape (N,))
+    """
+    if sampling == 'grid':
+        return grid_samples(ranges)
+
+    rng = np.random.default_rng(seed)
+
+    if sampling == 'random':
+        return random_samples(ranges, num_samples, rng)
+    if sampling == 'lhs':
+        return latin_hypercube_samples(ranges, num_samples, rng)
+
+    raise ValueError('unknown sampling method: {}'.format(sampling))
+
+
+# split samples into chunks
+def split_samples(samples, chunk_size):
+
+    num = len(next(iter(samples.values())))
+
+    for start in range(0, num, chunk_size):
+        yield {name: values[start:start + chunk_size] for name, values in samples.items()}
+
+
+# compute geometry of one chunk of aircraft(batched)
+def compute_chunk(base_params, samples, component_names=None, lod='standard', dtype=None):
+    """
+    compute geometry of every aircraft in chunk at once
+
+    :param base_params: parameters of base aircraft(AircraftParameters)
+    :param samples: dictionary of parameter name and numpy ndarray of shape (n,)
+    :param component_names: component names to generate(all components of aircraft type if it is None)
+    :param lod: level of detail(preview, standard or export)
+    :param dtype: floating point type of geometry(follows level of detail if it is None)
+    :return: dictionary of component name and numpy ndarray of shape (n, points, 3)
+    """
+    n = len(next(iter(samples.values())))
+
+    params = copy.copy(base_params)
+    for name, values in samples.items():
+        setattr(params, name, values)
+
+    view = AircraftView(params, lod=lod, dtype=dtype)
+    if component_names is None:
+        component_names = view.component_names
+
+    geometry = {}
+    for name in component_names:
+        arr = view.get_component(name)
+        if arr is None:
+            continue
+
+        # component which does not depend on sampled parameters is shared by the whole chunk
+        geometry[name] = np.broadcast_to(arr, (n,) + arr.shape[-2:])
+
+    return geometry
+
+
+# save arrays atomically
+def save_chunk(fname, arrs):
+
+    tmp_fname = '{}.{}.tmp.npz'.format(fname[:-4], os.getpid())
+    np.savez(tmp_fname, **arrs)
+    os.replace(tmp_fname, fname)
+
+
+# process pool task: compute one chunk and write it to disk
+def generate_chunk(base_params, samples, component_names, lod, dtype, fname):
+
+    geometry = compute_chunk(base_params, samples, component_names, lod, dtype)
+
+    arrs = {'param_{}'.format(name): values for name, values in samples.items()}
+    arrs.update(geometry)
+    save_chunk(fname, arrs)
+
+    return len(next(iter(samples.values())))
+
+
+# output blocks of population geometry which workers write into directly
+# (only offsets and shapes travel between processes)
+class GeometryBlocks(object):
+    """
+    one (N, points, 3) block per component on shared memory, or on .npy file mapped to memory if out_dir is given
+
+    arrays are views on the blocks, copy what is kept before close(shared memory is released)
+    """
+
+    def __init__(self, shapes, out_dir=None, dtype=float):
+
+        self.out_dir = out_dir
+        self.dtype = np.dtype(dtype)
+        self.blocks = {}
+        self.arrays = {}
+
+        for name, shape in shapes.items():
+            if out_dir is not None:
+                fname = os.path.join(out_dir, '{}.npy'.format(name))
+                self.arrays[name] = np.lib.format.open_memmap(fname, mode='w+', dtype=self.dtype, shape=shape)
+                self.blocks[name] = fname
+            else:
+                shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * self.dtype.itemsize, 1))
+                self.arrays[name] = np.ndarray(shape, dtype=self.dtype, buffer=shm.buf)
+                self.blocks[name] = shm
+
+    @property
+    def layout(self):
+        """
+        :return: dictionary of component name and (location(shared memory name or file name), shape, dtype)
+        """
+        return {name: (block if isinstance(block, str) else block.name, self.arrays[name].shape, self.dtype.str)
+                for name, block in self.blocks.items()}
+
+    def close(self):
+
+        for name, block in self.blocks.items():
+            arr = self.arrays.pop(name)
+            if isinstance(block, str):
+                arr.flush()
+                del arr
+            else:
+                del arr
+                block.close()
+                block.unlink()
+
+        self.blocks = {}
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *exc):
+
+        self.close()
+
+
+# open output block in worker
+def open_block(location, shape, dtype):
+
+    if location.endswith('.npy'):
+        return None, np.load(location, mmap_mode='r+')
+
+    shm = shared_memory.SharedMemory(name=location)
+
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+# process pool task: compute one chunk and write it into output blocks at its offset
+def fill_chunk(base_params, samples, component_names, lod, dtype, layout, offset):
+
+    geometry = compute_chunk(base_params, samples, component_names, lod, dtype)
+
+    for name, arr in geometry.items():
+        shm, block = open_block(*layout[name])
+        block[offset:offset + arr.shape[0]] = arr
+
+        if shm is None:
+            block.flush()
+        else:
+            del block
+            shm.close()
+
+    return len(next(iter(samples.values())))
+
+
+# progress of sweep
+def report_progress(count, num_chunks, done, num, start):
+
+    elapsed = time.time() - start
+    rate = done / elapsed if elapsed > 0 else 0.0
+
+    print('[{}/{}] chunks, {}/{} aircraft, {:.1f} s, {:.1f} aircraft/s'.format(
+        count, num_chunks, done, num, elapsed, rate), flush=True)
+
+
+# run tasks(each returns the number of aircraft it computed) on process pool, return the total number
+def execute_tasks(task, task_args, num, workers=None, verbose=True):
+
+    workers = workers or os.cpu_count()
+    start = time.time()
+    done = 0
+
+    if workers == 1:
+        for count, args in enumerate(task_args, 1):
+            done += task(*args)
+            if verbose:
+                report_progress(count, len(task_args), done, num, start)
+
+        return done
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(task, *args) for args in task_args]
+
+        for count, future in enumerate(as_completed(futures), 1):
+            done += future.result()
+            if verbose:
+                report_progress(count, len(task_args), done, num, start)
+
+    return done
+
+
+# shape of every component for population of num aircraft
+def pull_component_shapes(base_params, samples, component_names=None, lod='standard'):
+
+    num = len(next(iter(samples.values())))
+    probe = compute_chunk(base_params, {name: values[:1] for name, values in samples.items()}, component_names, lod)
+
+    return {name: (num,) + arr.shape[1:] for name, arr in probe.items()}
+
+
+def generate_shared(base_params, samples, component_names=None, out_dir=None, workers=None, chunk_size=256,
+                    lod='standard', dtype=None, verbose=True):
+    """
+    generate geometry of every sample on process pool, workers write into shared memory(or .npy files in out_dir)
+    so that no geometry is pickled back to parent
+
+    :param base_params: parameters of base aircraft(AircraftParameters)
+    :param samples: dictionary of parameter name and numpy ndarray of shape (N,)
+    :param component_names: component names to generate(all components of aircraft type if it is None)
+    :param out_dir: directory of .npy files(shared memory is used if it is None)
+    :param workers: the number of processes(all cores if it is None)
+    :param chunk_size: the number of aircraft per task
+    :param lod: level of detail(preview, standard or export)
+    :param dtype: floating point type of geometry(follows level of detail if it is None)
+    :param verbose: if True, report progress
+    :return: blocks(GeometryBlocks), blocks.arrays has (N, points, 3) array of every component
+    """
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+
+    num = len(next(iter(samples.values())))
+    dtype = pull_dtype(lod, dtype)
+    blocks = GeometryBlocks(pull_component_shapes(base_params, samples, component_names, lod), out_dir=out_dir,
+                            dtype=dtype)
+
+    try:
+        layout = blocks.layout
+        task_args = [(base_params, chunk, component_names, lod, dtype, layout, offset)
+                     for offset, chunk in zip(range(0, num, chunk_size), split_samples(samples, chunk_size))]
+
+        execute_tasks(fill_chunk, task_args, num, workers=workers, verbose=verbose)
+    except BaseException:
+        blocks.close()
+        raise
+
+    return blocks
+
+
+def run_sweep(base_params, samples, component_names=None, out_dir='./SweepResult', workers=None, chunk_size=256,
+              transport='npz', lod='standard', dtype=None, verbose=True):
+    """
+    generate geometry of every sample on process pool and write it to out_dir
+
+    transport npz: every chunk is written as one .npz file
+    (param_<name>: sampled parameters of shape (n,), <component>: geometry of shape (n, points, 3))
+    transport npy: workers write into one <component>.npy file of shape (N, points, 3) per component
+
+    :param base_params: parameters of base aircraft(AircraftParameters)
+    :param samples: dictionary of parameter name and numpy ndarray of shape (N,)
+    :param component_names: component names to generate(all components of aircraft type if it is None)
+    :param out_dir: directory of results
+    :param workers: the number of processes(all cores if it is None)
+    :param chunk_size: the number of aircraft per chunk
+    :param transport: npz or npy
+    :param lod: level of detail(preview, standard or export)
+    :param dtype: floating point type of geometry(follows level of detail if it is None)
+    :param verbose: if True, report progress
+    :return: list of result file names
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    # the whole design
+    save_chunk(os.path.join(out_dir, 'samples.npz'), samples)
+
+    if transport == 'npy':
+        blocks = generate_shared(base_params, samples, component_names, out_dir=out_dir, workers=workers,
+                                 chunk_size=chunk_size, lod=lod, dtype=dtype, verbose=verbose)
+        fnames = list(blocks.blocks.values())
+        blocks.close()
+
+        return fnames
+
+    if transport != 'npz':
+        raise ValueError('unknown transport: {}'.format(transport))
+
+    num = len(next(iter(samples.values())))
+    chunks = list(split_samples(samples, chunk_size))
+    fnames = [os.path.join(out_dir, 'chunk_{:06d}.npz'.format(idx)) for idx in range(len(chunks))]
+
+    task_args = [(base_params, chunk, component_names, lod, dtype, fname) for chunk, fname in zip(chunks, fnames)]
+    execute_tasks(generate_chunk, task_args, num, workers=workers, verbose=verbose)
+
+    return fnames
+
+
+if __name__ == '__main__':
+    l_args = load_args()
+
+    base_params = read_parameters(l_args.base, row=l_args.row)
+    if not hasattr(base_params, 'aircraft_type'):
+        base_params.aircraft_type = l_args.aircraft_type
+    if not hasattr(base_params, 'engine_type'):
+        base_params.engine_type = l_args.engine_type
+
+    ranges = [parse_range(text) for text in l_args.ranges]
+    samples = compute_samples(ranges, l_args.sampling, l_args.num_samples, l_args.seed)
+
+    run_sweep(base_params, samples, component_names=l_args.components, out_dir=l_args.out_dir,
+              workers=l_args.workers, chunk_size=l_args.chunk_size, transport=l_args.transport,
+              lod=l_args.lod, dtype=l_args.dtype)
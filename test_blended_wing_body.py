@@ -1,6 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from helper import bezier
+from helper import bezier_curve
 from mpl_toolkits.mplot3d import Axes3D
 
 # Blended Wing Body has two scenarios about construction
@@ -140,17 +140,14 @@ main_wing_arr = np.array(main_wing_arr)
 
 # horizontal face
 
-bezier_y1 = []
 qy1 = np.array([[0, 0], [0, u1 * lb], [v1 * lb, u2 * lb],
                 [(b * 0.5 - st[1]) * np.tan(theta * np.pi / 180.0) + st[0], b * 0.5]])
 
-bezier_y2 = []
 qy2 = np.array([[(b * 0.5 - st[1]) * np.tan(theta * np.pi / 180.0) + st[0] + ctip, b * 0.5],
                 [croot + st[0], st[1]], [lb, u3 * lb], [lb, 0]])
 
-for t in np.linspace(0, 1, 50):
-    bezier_y1.append(bezier(qy1.shape[0] - 1, t, qy1))
-    bezier_y2.append(bezier(qy2.shape[0] - 1, t, qy2))
+bezier_y1 = list(bezier_curve(qy1, 50))
+bezier_y2 = list(bezier_curve(qy2, 50))
 
 xs = (b * 0.5 - st[1]) * np.tan(theta * np.pi / 180.0) + st[0]
 xf = xs + ctip
@@ -1,6 +1,6 @@
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
-from helper import bezier
+from helper import bezier_curve
 import numpy as np
 
 # ToDo: arrange and clarify the arguments and split the module based on function
@@ -30,22 +30,16 @@ lower_sign = -1
 
 cockpit_arr = []
 
-bezier_zu = []
-bezier_zl = []
-
 uk = 0.5
 
 qzu = np.array([[0, 0], [l1 * uk, huc], [l1, huf]])
 qzl = np.array([[0, 0], [l1 * uk, -hlc], [l1, -hlf]])
 
-bezier_y = []
-
 qy = np.array([[0, 0], [l1 * uk, wc], [l1, wf]])
 
-for t in np.linspace(0, 1, 50):
-    bezier_zu.append(bezier(2, t, qzu)[1])
-    bezier_zl.append(bezier(2, t, qzl)[1])
-    bezier_y.append(bezier(2, t, qy)[1])
+bezier_zu = bezier_curve(qzu, 50)[:, 1]
+bezier_zl = bezier_curve(qzl, 50)[:, 1]
+bezier_y = bezier_curve(qy, 50)[:, 1]
 
 for xi, bzl, bzu, by in zip(x, bezier_zl, bezier_zu, bezier_y):
 
@@ -112,20 +106,15 @@ for xi in x:
 # after cabin part
 after_cabin_arr = []
 x = np.linspace(l2, l3, 50)
-bezier_zu = []
-bezier_zl = []
 
 qzu = np.array([[l2, huf], [l3, hau], [l3, hau]])
 qzl = np.array([[l2, -hlf], [l3, -hlc], [l3, 0]])
 
-bezier_y = []
-
 qy = np.array([[l2, wf], [l3, wa], [l3, 0]])
 
-for t in np.linspace(0, 1, 50):
-    bezier_zu.append(bezier(2, t, qzu)[1])
-    bezier_zl.append(bezier(2, t, qzl)[1])
-    bezier_y.append(bezier(2, t, qy)[1])
+bezier_zu = bezier_curve(qzu, 50)[:, 1]
+bezier_zl = bezier_curve(qzl, 50)[:, 1]
+bezier_y = bezier_curve(qy, 50)[:, 1]
 
 for xi, bzl, bzu, by in zip(x, bezier_zl, bezier_zu, bezier_y):
 
@@ -1,6 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
+from helper import turnover_3d, turnover_points
 
 huf = 1.5
 hlf = 0.2
@@ -114,19 +115,6 @@ for xi in x:
 after_cabin_arr = np.array(after_cabin_arr)
 
 # propeller(4)
-def turnover_3d(theta, n):
-    t_arr = np.array([[np.cos(theta) + n[0] ** 2 * (1 - np.cos(theta)),
-                       n[0] * n[1] * (1 - np.cos(theta)) - n[2] * np.sin(theta),
-                       n[2] * n[1] * (1 - np.cos(theta)) + n[1] * np.sin(theta)],
-                      [n[0] * n[1] * (1 - np.cos(theta)) + n[2] * np.sin(theta),
-                       np.cos(theta) + n[1] ** 2 * (1 - np.cos(theta)),
-                       n[1] * n[2] * (1 - np.cos(theta)) - n[0] * np.sin(theta)],
-                      [n[2] * n[0] * (1 - np.cos(theta)) - n[1] * np.sin(theta),
-                       n[1] * n[2] * (1 - np.cos(theta)) + n[0] * np.sin(theta),
-                       np.cos(theta) + n[2] ** 2 * (1 - np.cos(theta))]])
-
-    return t_arr
-
 joint_radius = 3.0
 joint_angle = 30
 diff_angle = 90
@@ -169,15 +157,8 @@ theta = 180
 theta = theta * np.pi / 180.0
 n = np.array([1, 0, 0])  # z axis unit vector
 
-propeller_arr1 = []
-
-for p_arr in propeller_arr:
-    t_arr = turnover_3d(theta, n)
-    target_vec = np.dot(t_arr.T, p_arr) - np.array([0, 0, 0.5 * lp])
-    propeller_arr1.append(target_vec)
-
-
-propeller_arr1 = np.array(propeller_arr1)
+t_arr = turnover_3d(theta, n)
+propeller_arr1 = turnover_points(propeller_arr, t_arr, -np.array([0, 0, 0.5 * lp]))
 
 # poll
 poll_r = 0.1
@@ -207,26 +188,13 @@ n = np.array([0, 0, 1])  # z axis unit vector
 poll_cen = [joint_point[0], joint_point[1], joint_point[2]]
 poll_cen = np.array(poll_cen)
 
-poll_arr1 = []
-for p_arr in poll_arr:
-
-    for theta in thetas:
-        t_arr = turnover_3d(theta, n)
-        p = np.dot(t_arr.T, p_arr) + poll_cen
-        poll_arr1.append(p)
-
-
-poll_arr1 = np.array(poll_arr1)
+# every pole point is turned over by every angle
+t_arrs = turnover_3d(thetas, n)
+poll_arr1 = turnover_points(np.array(poll_arr), t_arrs, poll_cen).reshape(-1, 3)
 
 # horizontal flip
-poll_arr2 = []
-
-for p_arr in poll_arr1:
-    t_arr = turnover_3d(180 - diff_angle / 2, np.array([1, 0, 0]))
-    p = np.dot(t_arr.T, p_arr) - np.array([0, 0, 0.5 * poll_r])
-    poll_arr2.append(p)
-
-poll_arr2 = np.array(poll_arr2)
+t_arr = turnover_3d(180 - diff_angle / 2, np.array([1, 0, 0]))
+poll_arr2 = turnover_points(poll_arr1, t_arr, -np.array([0, 0, 0.5 * poll_r]))
 
 
 
@@ -1,6 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from helper import bezier
+from helper import bezier_curve, turnover_3d, turnover_points
 from mpl_toolkits.mplot3d import Axes3D
 
 # ToDo: arrange the arguments and split the module based on function
@@ -33,21 +33,15 @@ lower_sign = -1
 
 cockpit_arr = []
 
-bezier_zu = []
-bezier_zl = []
-
 
 qzu = np.array([[0, 0], [0, huc], [l1, huf]])
 qzl = np.array([[0, 0], [0, -hlc], [l1, -hlf]])
 
-bezier_y = []
-
 qy = np.array([[0, 0], [0, wc], [l1, wf]])
 
-for t in np.linspace(0, 1, 50):
-    bezier_zu.append(bezier(2, t, qzu)[1])
-    bezier_zl.append(bezier(2, t, qzl)[1])
-    bezier_y.append(bezier(2, t, qy)[1])
+bezier_zu = bezier_curve(qzu, 50)[:, 1]
+bezier_zl = bezier_curve(qzl, 50)[:, 1]
+bezier_y = bezier_curve(qy, 50)[:, 1]
 
 for xi, bzl, bzu, by in zip(x, bezier_zl, bezier_zu, bezier_y):
 
@@ -122,20 +116,15 @@ cabin_arr = np.array(cabin_arr)
 # after cabin part(Bezier)
 x = np.linspace(l2, l3, 50)
 after_cabin_arr = []
-bezier_zu = []
-bezier_zl = []
 
 qzu = np.array([[l2, huf], [l3, hau], [l3, hau]])
 qzl = np.array([[l2, -hlf], [l3, -hlc], [l3, 0]])
 
-bezier_y = []
-
 qy = np.array([[l2, wf], [l3, wa], [l3, 0]])
 
-for t in np.linspace(0, 1, 50):
-    bezier_zu.append(bezier(2, t, qzu)[1])
-    bezier_zl.append(bezier(2, t, qzl)[1])
-    bezier_y.append(bezier(2, t, qy)[1])
+bezier_zu = bezier_curve(qzu, 50)[:, 1]
+bezier_zl = bezier_curve(qzl, 50)[:, 1]
+bezier_y = bezier_curve(qy, 50)[:, 1]
 
 for xi, bzl, bzu, by in zip(x, bezier_zl, bezier_zu, bezier_y):
 
@@ -195,19 +184,6 @@ after_cabin_arr = np.array(after_cabin_arr)
 """
 
 # propeller(4)
-def turnover_3d(theta, n):
-    t_arr = np.array([[np.cos(theta) + n[0] ** 2 * (1 - np.cos(theta)),
-                       n[0] * n[1] * (1 - np.cos(theta)) - n[2] * np.sin(theta),
-                       n[2] * n[1] * (1 - np.cos(theta)) + n[1] * np.sin(theta)],
-                      [n[0] * n[1] * (1 - np.cos(theta)) + n[2] * np.sin(theta),
-                       np.cos(theta) + n[1] ** 2 * (1 - np.cos(theta)),
-                       n[1] * n[2] * (1 - np.cos(theta)) - n[0] * np.sin(theta)],
-                      [n[2] * n[0] * (1 - np.cos(theta)) - n[1] * np.sin(theta),
-                       n[1] * n[2] * (1 - np.cos(theta)) + n[0] * np.sin(theta),
-                       np.cos(theta) + n[2] ** 2 * (1 - np.cos(theta))]])
-
-    return t_arr
-
 # ToDo: I have to implement horizontal version for propeller
 # propeller settings(vertical)
 # txs = [0.3, 0.4, 0.6, 0.7]
@@ -272,38 +248,27 @@ propeller_arr = np.concatenate([propeller_arr_l, propeller_arr_r], axis=0)
 # pole
 poll_r = 0.1  # arm radius
 
-poll_arr = []
-
-# right part
+# right part(upper half of the pole along x axis)
 x = np.linspace(0, radius + pr, 30)
-for xi in x:
-    y = np.linspace(-poll_r, poll_r, 30)
+y = np.linspace(-poll_r, poll_r, 30)
+poll_base = np.empty((30, 30, 3))
+poll_base[..., 0] = x[:, np.newaxis]
+poll_base[..., 1] = y
+poll_base[..., 2] = np.sqrt(poll_r ** 2 - y ** 2)
 
-    for yi in y:
-        target = np.sqrt(poll_r ** 2 - yi ** 2)
-        zui = target
-        zli = - target
+# turnover matrices of all poles at once
+thetas_u = -1 * (180 - np.array(thetas)) * np.pi / 180.0
+t_arr_u = turnover_3d(thetas_u, np.array([0, 0, 1]))
 
-        pu = [xi, yi, zui]
-        pl = [xi, yi, zli]
-
-        for idx in range(half_propeller_number):
-            rep_j = joint_points[idx]
-
-            theta = thetas[idx]
-
-            theta_u = -1 * (180 - theta) * np.pi / 180.0
-
-            t_arr_u = turnover_3d(theta_u, np.array([0, 0, 1]))
-
-            theta_l = 180 * np.pi / 180.0
+theta_l = 180 * np.pi / 180.0
+t_arr_l = turnover_3d(theta_l, np.array([0, 0, 1]))
 
-            t_arr_l = turnover_3d(theta_l, np.array([0, 0, 1]))
+shift_l = np.array([[l, 0, -2 * zdiffp * idx + (half_propeller_number - 1) * zdiffp]
+                    for idx in range(half_propeller_number)])
 
-            puu = np.dot(t_arr_u.T, np.array(pu)) + np.array([rep_j[0], rep_j[1], rep_j[2]])
-            pll = np.dot(t_arr_l.T, puu) + np.array([l, 0, -2 * zdiffp * idx + (half_propeller_number - 1) * zdiffp])
-            poll_arr.append(puu.tolist())
-            poll_arr.append(pll.tolist())
+puu = turnover_points(poll_base, t_arr_u, np.array(joint_points))
+pll = turnover_points(puu, t_arr_l, shift_l)
+poll_arr = np.stack([puu, pll], axis=-2).reshape(-1, 3)
 
 
 """
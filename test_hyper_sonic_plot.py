@@ -1,6 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from helper import bezier
+from helper import bezier_curve
 from mpl_toolkits.mplot3d import Axes3D
 
 # arguments
@@ -29,22 +29,16 @@ lower_sign = -1
 
 cockpit_arr = []
 
-bezier_zu = []
-bezier_zl = []
-
 uk = 0.5
 
 qzu = np.array([[0, 0], [l1 * uk, huc], [l1, huf]])
 qzl = np.array([[0, 0], [l1 * uk, -hlc], [l1, -hlf]])
 
-bezier_y = []
-
 qy = np.array([[0, 0], [l1 * uk, wc], [l1, wf]])
 
-for t in np.linspace(0, 1, 50):
-    bezier_zu.append(bezier(2, t, qzu)[1])
-    bezier_zl.append(bezier(2, t, qzl)[1])
-    bezier_y.append(bezier(2, t, qy)[1])
+bezier_zu = bezier_curve(qzu, 50)[:, 1]
+bezier_zl = bezier_curve(qzl, 50)[:, 1]
+bezier_y = bezier_curve(qy, 50)[:, 1]
 
 for xi, bzl, bzu, by in zip(x, bezier_zl, bezier_zu, bezier_y):
 
@@ -88,20 +82,15 @@ cabin_arr = np.array(cabin_arr)
 # after cabin
 after_cabin_arr = []
 x = np.linspace(l2, l3, 50)
-bezier_zu = []
-bezier_zl = []
 
 qzu = np.array([[l2, huf], [l3, hau], [l3, hau]])
 qzl = np.array([[l2, -hlf], [l3, -hlc], [l3, 0]])
 
-bezier_y = []
-
 qy = np.array([[l2, wf], [l3, wa], [l3, 0]])
 
-for t in np.linspace(0, 1, 50):
-    bezier_zu.append(bezier(2, t, qzu)[1])
-    bezier_zl.append(bezier(2, t, qzl)[1])
-    bezier_y.append(bezier(2, t, qy)[1])
+bezier_zu = bezier_curve(qzu, 50)[:, 1]
+bezier_zl = bezier_curve(qzl, 50)[:, 1]
+bezier_y = bezier_curve(qy, 50)[:, 1]
 
 for xi, bzl, bzu, by in zip(x, bezier_zl, bezier_zu, bezier_y):
 
@@ -133,9 +122,6 @@ y = np.linspace(wf, b / 2, 30)
 p = 0.5
 tc = 0.08
 
-bezier_yu = []
-bezier_yl = []
-
 theta = retreat_angle * np.pi / 180.0
 
 qyu = np.array([[(l1 + st[0]) * 0.5, wf],
@@ -144,9 +130,8 @@ qyu = np.array([[(l1 + st[0]) * 0.5, wf],
 qyl = np.array([[0.5 * b * np.tan(theta) + st[0] + ctip, 0.5 * b],
                 [st[0] + croot, wf], [l2, wf]])
 
-for t in np.linspace(0, 1, 50):
-    bezier_yu.append(bezier(2, t, qyu))
-    bezier_yl.append(bezier(2, t, qyl))
+bezier_yu = bezier_curve(qyu, 50)
+bezier_yl = bezier_curve(qyl, 50)
 
 
 bezier_yl = bezier_yl[::-1]
@@ -209,8 +194,6 @@ tc = 0.08
 main_wing_arr = []
 
 # bezier curve
-bezier_yu = []
-bezier_yl = []
 
 theta = retreat_angle * np.pi / 180.0
 
@@ -219,9 +202,8 @@ qyl = np.array([[0.5 * b * np.tan(retreat_angle * np.pi / 180.0) + st[0] + ctip,
                 [st[0] + wf * np.tan(retreat_angle * np.pi / 180.0) + (1.0 - wf / BX) * croot, wf],
                 [l2, wf]])
 
-for t in np.linspace(0, 1, 50):
-    bezier_yu.append(bezier(2, t, qyu))
-    bezier_yl.append(bezier(2, t, qyl))
+bezier_yu = bezier_curve(qyu, 50)
+bezier_yl = bezier_curve(qyl, 50)
 
 # match y coordinates
 bezier_yl = bezier_yl[::-1]
@@ -388,9 +370,6 @@ st = [l, 0, hau]
 p = 0.5
 tc = 0.08
 
-bezier_yu = []
-bezier_yl = []
-
 theta = retreat_angle * np.pi / 180.0
 
 qyu = np.array([[(l2 + st[0]) * 0.5, 0],
@@ -399,9 +378,8 @@ qyu = np.array([[(l2 + st[0]) * 0.5, 0],
 qyl = np.array([[0.5 * bh * np.tan(theta) + st[0] + chtip, 0.5 * bh],
                 [st[0] + chroot, 0], [l3, 0]])
 
-for t in np.linspace(0, 1, 50):
-    bezier_yu.append(bezier(2, t, qyu))
-    bezier_yl.append(bezier(2, t, qyl))
+bezier_yu = bezier_curve(qyu, 50)
+bezier_yl = bezier_curve(qyl, 50)
 
 
 bezier_yl = bezier_yl[::-1]
@@ -1,6 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from helper import bezier
+from helper import bezier_curve, turnover_3d, turnover_points
 from mpl_toolkits.mplot3d import Axes3D
 # cockpit
 huc = 0.8
@@ -31,21 +31,15 @@ lower_sign = -1
 
 cockpit_arr = []
 
-bezier_zu = []
-bezier_zl = []
-
 
 qzu = np.array([[0, 0], [0, huc], [l1, huf]])
 qzl = np.array([[0, 0], [0, -hlc], [l1, -hlf]])
 
-bezier_y = []
-
 qy = np.array([[0, 0], [0, wc], [l1, wf]])
 
-for t in np.linspace(0, 1, 50):
-    bezier_zu.append(bezier(2, t, qzu)[1])
-    bezier_zl.append(bezier(2, t, qzl)[1])
-    bezier_y.append(bezier(2, t, qy)[1])
+bezier_zu = bezier_curve(qzu, 50)[:, 1]
+bezier_zl = bezier_curve(qzl, 50)[:, 1]
+bezier_y = bezier_curve(qy, 50)[:, 1]
 
 for xi, bzl, bzu, by in zip(x, bezier_zl, bezier_zu, bezier_y):
 
@@ -89,20 +83,15 @@ cabin_arr = np.array(cabin_arr)
 # after cabin part(Bezier)
 x = np.linspace(l2, l3, 50)
 after_cabin_arr = []
-bezier_zu = []
-bezier_zl = []
 
 qzu = np.array([[l2, huf], [l3, hau], [l3, hau]])
 qzl = np.array([[l2, -hlf], [l3, -hlc], [l3, hau]])
 
-bezier_y = []
-
 qy = np.array([[l2, wf], [l3, wa], [l3, 0]])
 
-for t in np.linspace(0, 1, 50):
-    bezier_zu.append(bezier(2, t, qzu)[1])
-    bezier_zl.append(bezier(2, t, qzl)[1])
-    bezier_y.append(bezier(2, t, qy)[1])
+bezier_zu = bezier_curve(qzu, 50)[:, 1]
+bezier_zl = bezier_curve(qzl, 50)[:, 1]
+bezier_y = bezier_curve(qy, 50)[:, 1]
 
 for xi, bzl, bzu, by in zip(x, bezier_zl, bezier_zu, bezier_y):
 
@@ -159,20 +148,6 @@ for yi in y:
 
 main_wing_arr = np.array(main_wing_arr)
 
-# 3d turnover function
-def turnover_3d(theta, n):
-    t_arr = np.array([[np.cos(theta) + n[0] ** 2 * (1 - np.cos(theta)),
-                       n[0] * n[1] * (1 - np.cos(theta)) - n[2] * np.sin(theta),
-                       n[2] * n[1] * (1 - np.cos(theta)) + n[1] * np.sin(theta)],
-                      [n[0] * n[1] * (1 - np.cos(theta)) + n[2] * np.sin(theta),
-                       np.cos(theta) + n[1] ** 2 * (1 - np.cos(theta)),
-                       n[1] * n[2] * (1 - np.cos(theta)) - n[0] * np.sin(theta)],
-                      [n[2] * n[0] * (1 - np.cos(theta)) - n[1] * np.sin(theta),
-                       n[1] * n[2] * (1 - np.cos(theta)) + n[0] * np.sin(theta),
-                       np.cos(theta) + n[2] ** 2 * (1 - np.cos(theta))]])
-
-    return t_arr
-
 # propeller(upper)
 lower_sign = -1
 nprop = 2
@@ -232,15 +207,7 @@ for turn_angle in turn_angles:
 
     t_arr = turnover_3d(turn_angle, np.array([1, 0, 0]))
 
-    propeller_arr_turn = []
-
-    for pab in propeller_arr_base:
-        target = np.dot(t_arr.T, pab)
-        propeller_arr_turn.append(target.tolist())
-
-    propeller_arr_turn = np.array(propeller_arr_turn)
-
-    propeller_arr_turn += np.array(propeller_center_init)
+    propeller_arr_turn = turnover_points(propeller_arr_base, t_arr, np.array(propeller_center_init))
 
     propeller_total_arr.extend(propeller_arr_turn.tolist())
 
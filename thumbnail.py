@@ -0,0 +1,187 @@
+import os
+import sys
+import argparse
+from arguments import load_catalogue
+from render import POINT_BUDGET, create_offscreen_axes, draw_components, set_bounds
+from bbox import pull_axis_bounds
+from sweep import execute_tasks
+from view import AircraftView
+
+# headless batch renderer of standard views for every aircraft in catalogue
+# every worker process renders on one Agg figure, only the component artists are replaced between aircraft
+
+# standard views => (elevation, azimuth), x axis runs from nose to tail
+STANDARD_VIEWS = {'top': (90, -90), 'side': (0, -90), 'front': (0, 180), 'iso': (30, -60)}
+
+
+# load arguments
+def load_args():
+    parser = argparse.ArgumentParser()
+
+    # catalogue
+    parser.add_argument('--catalogue', default='./AircraftData/a320.csv', type=str,
+                        help='database file or directory of database files')
+    parser.add_argument('--aircraft_type', default='normal', type=str,
+                        help='used if database does not have it, 1. normal, 2. drone')
+    parser.add_argument('--engine_type', default='turbofan', type=str,
+                        help='used if database does not have it, 1. turbofan 2. propeller')
+
+    # images
+    parser.add_argument('--views', nargs='+', default=list(STANDARD_VIEWS), type=str,
+                        help='views to render, 1. top, 2. side, 3. front, 4. iso')
+    parser.add_argument('--lod', default='preview', type=str,
+                        help='level of detail, 1. preview, 2. standard, 3. export')
+    parser.add_argument('--point_budget', default=POINT_BUDGET, type=int, help='the number of points drawn at most')
+    parser.add_argument('--size', default=400, type=int, help='image width and height in pixel')
+    parser.add_argument('--axis', action='store_true', help='draw axis panes, grid and ticks')
+
+    # execution
+    parser.add_argument('--workers', default=None, type=int, help='the number of processes(all cores if not given)')
+    parser.add_argument('--chunk_size', default=16, type=int, help='the number of aircraft per task')
+    parser.add_argument('--out_dir', default='./Thumbnail', type=str, help='directory of images')
+
+    args = parser.parse_args()
+
+    return args
+
+
+class ThumbnailRenderer(object):
+    """
+    offscreen renderer which keeps one figure and 3d axes for many aircraft
+    """
+
+    def __init__(self, size=400, dpi=100, axis=False):
+
+        self.fig, self.ax = create_offscreen_axes(figsize=(size / dpi, size / dpi), dpi=dpi)
+        self.ax.set_proj_type('ortho')
+        # panes, grid and ticks take about half of drawing time
+        if not axis:
+            self.ax.set_axis_off()
+        self.artists = {}
+
+    def clear(self):
+
+        for artist in self.artists.values():
+            artist.remove()
+
+        self.artists = {}
+
+    def render(self, view, fname_format, views=tuple(STANDARD_VIEWS), point_budget=POINT_BUDGET):
+        """
+        render standard views of one aircraft
+
+        :param view: aircraft view(AircraftView)
+        :param fname_format: file name with {view} field(e.g. './Thumbnail/a320_{view}.png')
+        :param views: names of standard views
+        :param point_budget: the number of points drawn at most
+        :return: list of file names
+        """
+        self.clear()
+
+        components = {name: view.get_grid(name) for name in view.component_names}
+        self.artists = draw_components(self.ax, components, grid_layouts=view.component_grids,
+                                       point_budget=point_budget)
+
+        set_bounds(self.ax, pull_axis_bounds(view.get_bounds()))
+        self.ax.set_title(getattr(view.arg_class, 'cname', ''))
+
+        fnames = []
+        for name in views:
+            elev, azim = STANDARD_VIEWS[name]
+            self.ax.view_init(elev=elev, azim=azim)
+
+            fname = fname_format.format(view=name)
+            self.fig.savefig(fname)
+            fnames.append(fname)
+
+        return fnames
+
+
+# renderer of this process(created on first task, reused by following tasks)
+RENDERERS = {}
+
+
+def pull_renderer(size, axis=False):
+
+    if (size, axis) not in RENDERERS:
+        RENDERERS[size, axis] = ThumbnailRenderer(size=size, axis=axis)
+
+    return RENDERERS[size, axis]
+
+
+# process pool task: render every aircraft of one chunk of catalogue, return the number of rendered aircraft
+# (aircraft which fail are reported and skipped, so that one broken row does not stop whole catalogue)
+def render_chunk(catalogue, start, defaults, views, lod, point_budget, size, axis, out_dir):
+
+    renderer = pull_renderer(size, axis)
+    rendered = 0
+
+    for idx in range(len(catalogue)):
+        params = catalogue[idx]
+        for name, value in defaults.items():
+            if not hasattr(params, name):
+                setattr(params, name, value)
+
+        cname = getattr(params, 'cname', '')
+        try:
+            view = AircraftView(params, lod=lod)
+            fname_format = os.path.join(out_dir, '{:06d}_{}_{{view}}.png'.format(start + idx, cname))
+            renderer.render(view, fname_format, views=views, point_budget=point_budget)
+        except Exception as e:
+            print('failed to render {}(row {}): {}: {}'.format(cname, start + idx, type(e).__name__, e),
+                  file=sys.stderr, flush=True)
+            continue
+
+        rendered += 1
+
+    return rendered
+
+
+def render_catalogue(catalogue, out_dir='./Thumbnail', views=tuple(STANDARD_VIEWS), defaults=None, lod='preview',
+                     point_budget=POINT_BUDGET, size=400, axis=False, workers=None, chunk_size=16, verbose=True):
+    """
+    render standard views of every aircraft in catalogue on process pool
+    (images are written as <row>_<cname>_<view>.png in out_dir)
+
+    :param catalogue: aircraft catalogue(ParameterCatalogue)
+    :param out_dir: directory of images
+    :param views: names of standard views(top, side, front, iso)
+    :param defaults: dictionary of parameter name and value used if aircraft does not have it
+    :param lod: level of detail(preview, standard or export)
+    :param point_budget: the number of points drawn at most per aircraft
+    :param size: image width and height in pixel
+    :param axis: if True, draw axis panes, grid and ticks
+    :param workers: the number of processes(all cores if it is None)
+    :param chunk_size: the number of aircraft per task
+    :param verbose: if True, report progress
+    :return: the number of aircraft which failed to be rendered
+    """
+    for name in views:
+        if name not in STANDARD_VIEWS:
+            raise ValueError('unknown view: {}'.format(name))
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    task_args = []
+    for start in range(0, len(catalogue), chunk_size):
+        chunk = catalogue.select(slice(start, start + chunk_size))
+        task_args.append((chunk, start, defaults or {}, tuple(views), lod, point_budget, size, axis, out_dir))
+
+    rendered = execute_tasks(render_chunk, task_args, len(catalogue), workers=workers, verbose=verbose)
+
+    return len(catalogue) - rendered
+
+
+if __name__ == '__main__':
+    l_args = load_args()
+
+    catalogue = load_catalogue(l_args.catalogue)
+    defaults = {'aircraft_type': l_args.aircraft_type, 'engine_type': l_args.engine_type}
+
+    failures = render_catalogue(catalogue, out_dir=l_args.out_dir, views=l_args.views, defaults=defaults,
+                                lod=l_args.lod, point_budget=l_args.point_budget, size=l_args.size, axis=l_args.axis,
+                                workers=l_args.workers, chunk_size=l_args.chunk_size)
+
+    if failures > 0:
+        print('{}/{} aircraft failed to be rendered'.format(failures, len(catalogue)), file=sys.stderr)
+        sys.exit(1)
@@ -1,14 +1,19 @@
 import argparse
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
+import numpy as np
 # for normal aircraft
 from component import compute_cockpit_arr, compute_cabin_arr, compute_after_cabin_arr
 from component import compute_main_wing_arr, compute_horizontal_wing, compute_vertical_wing
-from component import compute_engine_lower_main_wing, compute_engine_upper_main_wing, compute_engine_upper_cabin
+from component import compute_engine, ENGINE_SETTINGS, GRID_LAYOUTS, flatten_grid, pull_resolution, pull_dtype
 from arguments import NormalArguments
 # for drone
 from component import compute_propeller_with_normal_position
 from arguments import DroneArguments
+from helper import grid_faces
+from cache import GeometryCache, ParameterRecorder, compute_geometry
+from store import write_point_cloud
+from export import open_exporter
+from render import POINT_BUDGET, render_png, show_components
+from bbox import bounding_box, merge_bounding_boxes, pull_axis_bounds
 
 
 # load arguments
@@ -30,12 +35,30 @@ def load_args():
     parser.add_argument('--engine_type', default='propeller', type=str, help='1. turbofan 2. propeller')
     """
 
+    """
     ## distributed fan case
     parser.add_argument('--cname', default='a320', type=str)
     parser.add_argument('--aircraft_type', default='normal', type=str,
                         help='1. normal, 2. drone, 3. blended wing body, 4. hyper sonic, 5. propeller')
     parser.add_argument('--engine_type', default='distributed fan', type=str,
                         help='1. turbofan 2. propeller 3. distributed fan(turbofan + electric fan)')
+    """
+
+    # geometry cache(disabled if it is not given)
+    parser.add_argument('--cache_dir', default=None, type=str, help='directory of geometry cache')
+    # point cloud store(not written if it is not given)
+    parser.add_argument('--store', default=None, type=str, help='file name of point cloud store')
+    # export(ply, xyz or obj, not written if it is not given)
+    parser.add_argument('--export', default=None, type=str, help='file name of exported point cloud')
+    parser.add_argument('--ascii', action='store_true', help='write ascii ply instead of binary one')
+    # level of detail
+    parser.add_argument('--lod', default='standard', type=str, help='1. preview, 2. standard, 3. export')
+    parser.add_argument('--dtype', default=None, type=str,
+                        help='floating point type of geometry(float32 for preview and standard, float64 for export '
+                             'if it is not given)')
+    # offscreen rendering(window is opened if it is not given)
+    parser.add_argument('--png', default=None, type=str, help='file name of rendered image')
+    parser.add_argument('--point_budget', default=POINT_BUDGET, type=int, help='the number of points drawn at most')
 
     args = parser.parse_args()
 
@@ -43,77 +66,333 @@ def load_args():
     return args
 
 
+# component array which is computed on first access
+def component_property(name):
+
+    return property(lambda self: self.get_component(name), doc='{} array(computed on demand)'.format(name))
+
+
 class AircraftView(object):
 
-    def __init__(self, arg_class):
+    # geometry unit => (setter method, component names of returned arrays), computed in this order
+    geometry_units = {'cockpit': ('set_cockpit_arr', ('cockpit',)),
+                      'cabin': ('set_cabin_arr', ('cabin',)),
+                      'after_cabin': ('set_after_cabin', ('after_cabin',)),
+                      'main_wing': ('set_main_wing', ('main_wing',)),
+                      'hori_wing': ('set_hori_wing', ('hori_wing',)),
+                      'vert_wing': ('set_vert_wing', ('vert_wing',)),
+                      'engine': ('set_engine', ('engine',)),
+                      'propeller': ('set_propeller', ('propeller', 'arm'))}
+
+    # component name => (geometry unit, index of returned arrays)
+    component_units = {name: (unit, idx) for unit, (_, names) in geometry_units.items()
+                       for idx, name in enumerate(names)}
+
+    # component name => (the number of grid axes, surface axes) of structured grid
+    component_grids = {'cockpit': GRID_LAYOUTS['compute_cockpit_arr'],
+                       'cabin': GRID_LAYOUTS['compute_cabin_arr'],
+                       'after_cabin': GRID_LAYOUTS['compute_after_cabin_arr'],
+                       'main_wing': GRID_LAYOUTS['compute_main_wing_arr'],
+                       'hori_wing': GRID_LAYOUTS['compute_horizontal_wing'],
+                       'vert_wing': GRID_LAYOUTS['compute_vertical_wing'],
+                       'engine': GRID_LAYOUTS['compute_engine'],
+                       'propeller': GRID_LAYOUTS['compute_propeller_with_normal_position'][0],
+                       'arm': GRID_LAYOUTS['compute_propeller_with_normal_position'][1]}
+
+    cockpit_arr = component_property('cockpit')
+    cabin_arr = component_property('cabin')
+    after_cabin_arr = component_property('after_cabin')
+    main_wing_arr = component_property('main_wing')
+    hori_wing_arr = component_property('hori_wing')
+    vert_wing_arr = component_property('vert_wing')
+    engine_arr = component_property('engine')
+    propeller_arr = component_property('propeller')
+    arm_arr = component_property('arm')
+
+    def __init__(self, arg_class, cache=None, lod='standard', resolution=None, dtype=None):
 
         self.arg_class = arg_class
+        # geometry cache(GeometryCache), every component is recomputed if it is None
+        self.cache = cache
+        # level of detail(preview, standard or export) and per unit overrides(e.g. {'main_wing': {'nspan': 100}})
+        self.lod = lod
+        self.resolution = resolution or {}
+        # floating point type of geometry(follows level of detail if it is None)
+        self.dtype = pull_dtype(lod, dtype)
+
+        # memoized geometry of each unit and the parameter names read to build it
+        # (every component is computed lazily on first access)
+        self.geometry = {}
+        self.parameter_reads = {}
+        # bounding box of each component, computed once when its unit is built
+        self.bboxes = {}
 
         self.component_names = self.pull_component_names()
-        if self.component_names is not None:
-            self.component_name_idx_dict = {}
-            for idx, name in enumerate(self.component_names):
-                self.component_name_idx_dict[name] = idx
-
-            # set component geometry
-            self.cockpit_arr = self.set_cockpit_arr()
-            self.cabin_arr = self.set_cabin_arr()
-            self.after_cabin_arr = self.set_after_cabin()
-            self.main_wing_arr = self.set_main_wing()
-            self.hori_wing_arr = self.set_hori_wing()
-            self.vert_wing_arr = self.set_vert_wing()
-            self.engine_arr = self.set_engine()
-            self.propeller_arr, self.arm_arr = self.set_propeller()
-
-            self.component_geometry = [self.cockpit_arr, self.cabin_arr, self.after_cabin_arr, self.main_wing_arr,
-                                       self.hori_wing_arr, self.vert_wing_arr, self.engine_arr, self.propeller_arr,
-                                       self.arm_arr]
-        else:
-            self.component_geometry = []
+        self.component_name_idx_dict = {}
+        for idx, name in enumerate(self.component_names):
+            self.component_name_idx_dict[name] = idx
+
+    @property
+    def component_geometry(self):
+
+        return [self.get_component(name) for name in self.component_units]
+
+    def get_component(self, name):
+        """
+        get component array, computing it on first access
+
+        :param name: component name(cockpit, cabin, after_cabin, main_wing, hori_wing, vert_wing, engine,
+                     propeller, arm)
+        :return: component array(numpy ndarray), None if the aircraft does not have the component
+        """
+        grid_arr = self.get_grid(name)
+
+        if grid_arr is None:
+            return None
+
+        return flatten_grid(grid_arr, self.component_grids[name][0])
+
+    def get_grid(self, name):
+        """
+        get structured grid of component(component array is its flattened view)
+
+        :param name: component name
+        :return: grid array(numpy ndarray, shape (..., *grid, 3)), None if the aircraft does not have the component
+        """
+        unit, idx = self.component_units[name]
+
+        return self.get_geometry(unit)[idx]
+
+    def get_faces(self, name, triangles=False):
+        """
+        get faces of component which connect neighbor points of its structured grid
+
+        :param name: component name
+        :param triangles: if True, return triangles instead of quads
+        :return: vertex indices in component array(numpy ndarray, shape (m, 4) or (2 * m, 3)),
+                 None if the aircraft does not have the component
+        """
+        grid_arr = self.get_grid(name)
+
+        if grid_arr is None:
+            return None
+
+        grid_ndim, grid_axes = self.component_grids[name]
+
+        return grid_faces(grid_arr.shape[grid_arr.ndim - grid_ndim - 1:-1], grid_axes, triangles=triangles)
+
+    def get_bbox(self, name):
+        """
+        get axis aligned bounding box of component
+
+        :param name: component name
+        :return: bounding box(numpy ndarray, shape (..., 2, 3)), None if the aircraft does not have the component
+        """
+        self.get_geometry(self.component_units[name][0])
+
+        return self.bboxes.get(name)
+
+    def get_bounds(self, names=None):
+        """
+        get bounding box of aircraft(merged bounding boxes of components)
+
+        :param names: component names(every component of aircraft if it is None)
+        :return: bounding box(numpy ndarray, shape (..., 2, 3)), None if there is no component
+        """
+        if names is None:
+            names = self.component_names
+
+        return merge_bounding_boxes([self.get_bbox(name) for name in names])
 
-    def view_unit(self, name, bounds):
+    def get_geometry(self, unit):
 
-        fig = plt.figure()
-        ax = Axes3D(fig)
+        if unit not in self.geometry:
+            self.geometry[unit] = self.build_geometry(unit)
 
-        target_arr = self.component_geometry[self.component_name_idx_dict[name]]
+            for name, grid_arr in zip(self.geometry_units[unit][1], self.geometry[unit]):
+                if grid_arr is not None:
+                    self.bboxes[name] = bounding_box(grid_arr, self.component_grids[name][0])
 
-        ax.scatter(target_arr[:, 0], target_arr[:, 1], target_arr[:, 2])
+        return self.geometry[unit]
 
-        ax.set_title('{} view'.format(name))
+    def build_geometry(self, unit):
 
-        ax.set_xlim(bounds[0])
-        ax.set_ylim(bounds[1])
-        ax.set_zlim(bounds[2])
+        setter, names = self.geometry_units[unit]
 
-        plt.show()
+        # record parameters read by the setter(including cache lookup and compute function)
+        arg_class = self.arg_class
+        self.arg_class = ParameterRecorder(arg_class)
+        try:
+            geometry = getattr(self, setter)()
+        finally:
+            recorder, self.arg_class = self.arg_class, arg_class
 
-    def view_all(self, bounds):
+        self.parameter_reads[unit] = set(recorder.names)
 
-        fig = plt.figure()
-        ax = Axes3D(fig)
+        if len(names) == 1:
+            geometry = (geometry,)
 
-        for target_arr in self.component_geometry:
-            if target_arr is not None:
-                ax.scatter(target_arr[:, 0], target_arr[:, 1], target_arr[:, 2])
+        return geometry
 
-        ax.set_title('total view')
+    def invalidate(self, param_names):
+        """
+        drop memoized geometry which depends on the parameters
 
-        ax.set_xlim(bounds[0])
-        ax.set_ylim(bounds[1])
-        ax.set_zlim(bounds[2])
+        :param param_names: names of changed parameters
+        :return: set of invalidated unit names
+        """
+        param_names = set(param_names)
+        invalid = {unit for unit, reads in self.parameter_reads.items() if reads & param_names}
 
-        plt.show()
+        for unit in invalid:
+            self.release(unit)
+
+        return invalid
+
+    def set_lod(self, lod, resolution=None, dtype=None):
+        """
+        change level of detail, every component is recomputed on next access
+
+        :param lod: level of detail(preview, standard or export)
+        :param resolution: per unit overrides of sampling keyword arguments
+        :param dtype: floating point type of geometry(follows level of detail if it is None)
+        """
+        self.lod = lod
+        self.resolution = resolution or {}
+        self.dtype = pull_dtype(lod, dtype)
+
+        for unit in list(self.geometry):
+            self.release(unit)
+
+    def pull_resolution(self, unit, compute_func):
+
+        return pull_resolution(compute_func, self.lod, self.resolution.get(unit))
+
+    def update_params(self, **params):
+        """
+        change parameters and drop only the components which depend on them
+        (they are recomputed on next access)
+
+        :param params: parameter name and new value
+        :return: set of invalidated unit names
+        """
+        for name, value in params.items():
+            setattr(self.arg_class, name, value)
+
+        return self.invalidate(params.keys())
+
+    def save_point_cloud(self, fname):
+        """
+        write every component into point cloud store(open it with store.open_point_cloud)
+
+        :param fname: file name
+        :return: offset table
+        """
+        components = {name: self.get_component(name) for name in self.component_names}
+        bbox = self.get_bounds()
+        meta = {'cname': getattr(self.arg_class, 'cname', None),
+                'aircraft_type': getattr(self.arg_class, 'aircraft_type', None),
+                'bounds': bbox.tolist() if bbox is not None else None}
+
+        return write_point_cloud(fname, components, meta=meta)
+
+    def export(self, fname, binary=True, chunk_size=1 << 16, faces=True, triangles=False, dtype=np.float64):
+        """
+        stream every component into ply, xyz or obj file
+
+        components are computed one by one and the ones computed here are released as soon as they are written
+
+        :param fname: file name(format is chosen by extension)
+        :param binary: if True, write binary ply
+        :param chunk_size: the number of points converted at once
+        :param faces: if True, write faces of structured grid too(ignored by xyz)
+        :param triangles: if True, write triangles instead of quads
+        :param dtype: floating point type of exported geometry(view of another type is not reused)
+        """
+        if np.dtype(dtype) != self.dtype:
+            view = AircraftView(self.arg_class, cache=self.cache, lod=self.lod, resolution=self.resolution,
+                                dtype=dtype)
+
+            return view.export(fname, binary=binary, chunk_size=chunk_size, faces=faces, triangles=triangles,
+                               dtype=dtype)
+
+        memoized = set(self.geometry)
+
+        with open_exporter(fname, binary=binary, chunk_size=chunk_size) as exporter:
+            for idx, name in enumerate(self.component_names):
+                target_arr = self.get_component(name)
+                if target_arr is not None:
+                    target_faces = self.get_faces(name, triangles=triangles) if faces else None
+                    exporter.add_component(name, target_arr, faces=target_faces)
+                del target_arr
+
+                # units which remaining components need(e.g. arm is built together with propeller)
+                needed = {self.component_units[remaining][0] for remaining in self.component_names[idx + 1:]}
+
+                for unit in set(self.geometry) - memoized - needed:
+                    self.release(unit)
+
+    def release(self, unit):
+        """
+        drop memoized geometry of unit(it is recomputed on next access)
+
+        :param unit: geometry unit name
+        """
+        self.geometry.pop(unit, None)
+        self.parameter_reads.pop(unit, None)
+        for name in self.geometry_units[unit][1]:
+            self.bboxes.pop(name, None)
+
+    def view_unit(self, name, bounds=None, point_budget=POINT_BUDGET, fname=None, block=True):
+        """
+        draw surface of one component
+
+        :param name: component name
+        :param bounds: axis bounds [[xmin, xmax], [ymin, ymax], [zmin, zmax]], None means bounding box of component
+        :param point_budget: the number of points drawn at most(grid is decimated above it)
+        :param fname: if given, render offscreen into png file instead of opening window
+        :param block: if False, return without waiting for the window to be closed
+        """
+        if bounds is None:
+            bounds = pull_axis_bounds(self.get_bbox(name))
+
+        self.draw({name: self.get_grid(name)}, bounds, '{} view'.format(name), point_budget, fname, block)
+
+    def view_all(self, bounds=None, point_budget=POINT_BUDGET, fname=None, block=True):
+        """
+        draw surfaces of every component
+
+        :param bounds: axis bounds [[xmin, xmax], [ymin, ymax], [zmin, zmax]], None means bounding box of aircraft
+        :param point_budget: the number of points drawn at most(grids are decimated above it)
+        :param fname: if given, render offscreen into png file instead of opening window
+        :param block: if False, return without waiting for the window to be closed
+        """
+        components = {name: self.get_grid(name) for name in self.component_names}
+        if bounds is None:
+            bounds = pull_axis_bounds(self.get_bounds())
+
+        self.draw(components, bounds, 'total view', point_budget, fname, block)
+
+    def draw(self, components, bounds, title, point_budget, fname, block):
+
+        if fname is not None:
+            render_png(fname, components, grid_layouts=self.component_grids, bounds=bounds, title=title,
+                       point_budget=point_budget)
+        else:
+            show_components(components, grid_layouts=self.component_grids, bounds=bounds, title=title,
+                            point_budget=point_budget, block=block)
 
     def pull_component_names(self):
 
-        component_names = None
+        aircraft_type = self.arg_class.aircraft_type
 
         # aircraft type => 1. normal, 2. drone, 3. distributed fan, 4. blended wing body, 5. hyper sonic, 6. propeller
-        if self.arg_class.aircraft_type == 'normal':
+        if aircraft_type == 'normal':
             component_names = ['cockpit', 'cabin', 'after_cabin', 'main_wing', 'hori_wing', 'vert_wing', 'engine']
-        elif self.arg_class.aircraft_type == 'drone':
+        elif aircraft_type == 'drone':
             component_names = ['cockpit', 'cabin', 'after_cabin', 'propeller', 'arm']
+        else:
+            raise ValueError('unsupported aircraft type: {}'.format(aircraft_type))
 
         return component_names
 
@@ -123,14 +402,16 @@ class AircraftView(object):
 
             return None
 
-        return compute_cockpit_arr(self.arg_class)
+        return compute_geometry(compute_cockpit_arr, self.arg_class, structured=True, cache=self.cache,
+                                dtype=self.dtype, **self.pull_resolution('cockpit', compute_cockpit_arr))
 
     def set_cabin_arr(self):
 
         if 'cabin' not in self.component_names:
             return None
 
-        return compute_cabin_arr(self.arg_class)
+        return compute_geometry(compute_cabin_arr, self.arg_class, structured=True, cache=self.cache,
+                                dtype=self.dtype, **self.pull_resolution('cabin', compute_cabin_arr))
 
     def set_after_cabin(self):
 
@@ -138,7 +419,8 @@ class AircraftView(object):
 
             return None
 
-        return compute_after_cabin_arr(self.arg_class)
+        return compute_geometry(compute_after_cabin_arr, self.arg_class, structured=True, cache=self.cache,
+                                dtype=self.dtype, **self.pull_resolution('after_cabin', compute_after_cabin_arr))
 
     def set_main_wing(self):
 
@@ -146,7 +428,8 @@ class AircraftView(object):
 
             return None
 
-        return compute_main_wing_arr(self.arg_class)
+        return compute_geometry(compute_main_wing_arr, self.arg_class, structured=True, cache=self.cache,
+                                dtype=self.dtype, **self.pull_resolution('main_wing', compute_main_wing_arr))
 
     def set_hori_wing(self):
 
@@ -154,7 +437,8 @@ class AircraftView(object):
 
             return None
 
-        return compute_horizontal_wing(self.arg_class)
+        return compute_geometry(compute_horizontal_wing, self.arg_class, structured=True, cache=self.cache,
+                                dtype=self.dtype, **self.pull_resolution('hori_wing', compute_horizontal_wing))
 
     def set_vert_wing(self):
 
@@ -162,7 +446,8 @@ class AircraftView(object):
 
             return None
 
-        return compute_vertical_wing(self.arg_class)
+        return compute_geometry(compute_vertical_wing, self.arg_class, structured=True, cache=self.cache,
+                                dtype=self.dtype, **self.pull_resolution('vert_wing', compute_vertical_wing))
 
     def set_engine(self):
 
@@ -172,24 +457,21 @@ class AircraftView(object):
 
         engine_settings = self.arg_class.engine_settings
 
-        if engine_settings == 'lower_main_wing':
-
-            return compute_engine_lower_main_wing(self.arg_class, self.main_wing_arr)
+        if engine_settings not in ENGINE_SETTINGS:
 
-        elif engine_settings == 'upper_main_wing':
-
-            return compute_engine_upper_main_wing(self.arg_class, self.main_wing_arr)
-
-        elif engine_settings == 'upper_cabin':
+            return None
 
-            return compute_engine_upper_cabin(self.arg_class, self.cabin_arr)
+        return compute_geometry(compute_engine, self.arg_class, engine_settings, structured=True, cache=self.cache,
+                                dtype=self.dtype, **self.pull_resolution('engine', compute_engine))
 
     def set_propeller(self):
         if 'propeller' not in self.component_names:
 
             return None, None
 
-        return compute_propeller_with_normal_position(self.arg_class, self.cabin_arr)
+        return compute_geometry(compute_propeller_with_normal_position, self.arg_class, structured=True,
+                                cache=self.cache, dtype=self.dtype,
+                                **self.pull_resolution('propeller', compute_propeller_with_normal_position))
 
 
 if __name__ == '__main__':
@@ -202,20 +484,25 @@ if __name__ == '__main__':
         args = None
 
     if args is not None:
+        cache = GeometryCache(l_args.cache_dir) if l_args.cache_dir is not None else None
+
         # create viewer class
-        av = AircraftView(args)
+        av = AircraftView(args, cache=cache, lod=l_args.lod, dtype=l_args.dtype)
 
-        # change bounds area according to aircraft and engine type
-        if args.aircraft_type == 'normal':
-            bounds = [[-10, 40], [-20, 20], [-15, 15]]  # normal case
-        elif args.aircraft_type == 'drone':
-            bounds = [[-2, 8], [-5, 5], [-5, 5]]  # drone case
-        else:
-            bounds = [[-10, 40], [-20, 20], [-15, 15]]
+        if l_args.store is not None:
+            av.save_point_cloud(l_args.store)
+        if l_args.export is not None:
+            av.export(l_args.export, binary=not l_args.ascii)
+
+        # bounds area of whole aircraft(cabin is shown in the same area)
+        bounds = pull_axis_bounds(av.get_bounds())
 
-        av.view_all(bounds=bounds)
+        if l_args.png is not None:
+            av.view_all(bounds=bounds, point_budget=l_args.point_budget, fname=l_args.png)
+        else:
+            av.view_all(bounds=bounds, point_budget=l_args.point_budget)
 
-        av.view_unit(name='cabin', bounds=bounds)
+            av.view_unit(name='cabin', bounds=bounds, point_budget=l_args.point_budget)
 
 
 